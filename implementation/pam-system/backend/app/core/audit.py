@@ -1,10 +1,131 @@
-from typing import Any, Dict, Optional
+import asyncio
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.db import engine
 from app.models import AuditEvent
 
 
+def _event_row(
+    actor_id: Optional[int],
+    action: str,
+    resource_type: str,
+    resource_id: str,
+    ip: Optional[str],
+    metadata: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
+        "actor_id": actor_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": str(resource_id),
+        "ts": datetime.utcnow(),
+        "ip": ip,
+        "metadata_json": metadata,
+    }
+
+
+class AuditBuffer:
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flushed_events = 0
+        self.overflow_events = 0
+        self.failed_events = 0
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def try_enqueue(self, row: Dict[str, Any]) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.overflow_events += 1
+            return False
+        return True
+
+    def enqueue(self, row: Dict[str, Any]) -> None:
+        if not self.try_enqueue(row):
+            self._write([row])
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        with engine.begin() as conn:
+            conn.execute(insert(AuditEvent), rows)
+        self.flushed_events += len(rows)
+
+    def _drain(self, first: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(rows) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return rows
+
+    def _run(self) -> None:
+        while not (self._stopped.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            rows = self._drain(first)
+            try:
+                self._write(rows)
+            except Exception:
+                for row in rows:
+                    try:
+                        self._write([row])
+                    except Exception:
+                        self.failed_events += 1
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+audit_buffer = AuditBuffer(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_MS / 1000,
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+)
+
+
+def record_audit_event(
+    db: Session,
+    actor_id: Optional[int],
+    action: str,
+    resource_type: str,
+    resource_id: str,
+    ip: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> None:
+    db.add(AuditEvent(**_event_row(actor_id, action, resource_type, resource_id, ip, metadata)))
+
+
 def create_audit_event(
     db: Session,
     actor_id: Optional[int],
@@ -14,13 +135,26 @@ def create_audit_event(
     ip: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None,
 ) -> None:
-    event = AuditEvent(
-        actor_id=actor_id,
-        action=action,
-        resource_type=resource_type,
-        resource_id=str(resource_id),
-        ip=ip,
-        metadata_json=metadata,
-    )
-    db.add(event)
+    if settings.AUDIT_BUFFER_ENABLED and action not in settings.AUDIT_SYNC_ACTIONS:
+        audit_buffer.enqueue(_event_row(actor_id, action, resource_type, resource_id, ip, metadata))
+        return
+    record_audit_event(db, actor_id, action, resource_type, resource_id, ip=ip, metadata=metadata)
     db.commit()
+
+
+async def create_audit_event_async(
+    db: AsyncSession,
+    actor_id: Optional[int],
+    action: str,
+    resource_type: str,
+    resource_id: str,
+    ip: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> None:
+    if settings.AUDIT_BUFFER_ENABLED and action not in settings.AUDIT_SYNC_ACTIONS:
+        row = _event_row(actor_id, action, resource_type, resource_id, ip, metadata)
+        if not audit_buffer.try_enqueue(row):
+            await asyncio.to_thread(audit_buffer._write, [row])
+        return
+    record_audit_event(db, actor_id, action, resource_type, resource_id, ip=ip, metadata=metadata)
+    await db.commit()
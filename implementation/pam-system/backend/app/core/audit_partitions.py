@@ -0,0 +1,128 @@
+import gzip
+import os
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import engine
+
+BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+DEFAULT_PARTITION = "audit_events_default"
+
+PartitionBound = Tuple[str, Optional[datetime], Optional[datetime]]
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def _parse_bound(raw: str) -> Optional[datetime]:
+    raw = raw.strip()
+    if raw in {"MINVALUE", "MAXVALUE"}:
+        return None
+    return datetime.fromisoformat(raw.strip("'"))
+
+
+def partition_bounds(conn) -> List[PartitionBound]:
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'audit_events'::regclass"
+        )
+    ).all()
+    bounds = []
+    for name, expression in rows:
+        match = BOUND_RE.search(expression or "")
+        if not match:
+            continue
+        bounds.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return bounds
+
+
+def _create_partition(conn, name: str, start: datetime, end: datetime) -> None:
+    bounds = {"start": start, "end": end}
+    create = text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_events "
+        f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')"
+    )
+    has_default = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}).scalar()
+    stranded = has_default and conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE ts >= :start AND ts < :end)"),
+        bounds,
+    ).scalar()
+    if not stranded:
+        conn.execute(create)
+        return
+    conn.execute(text(f"ALTER TABLE audit_events DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(create)
+    conn.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE ts >= :start AND ts < :end"),
+        bounds,
+    )
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE ts >= :start AND ts < :end"), bounds)
+    conn.execute(text(f"ALTER TABLE audit_events ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def ensure_audit_partitions(months_ahead: int, now: Optional[datetime] = None) -> List[str]:
+    target = _add_months(_month_start(now or datetime.utcnow()), months_ahead + 1)
+    created = []
+    with engine.begin() as conn:
+        uppers = [upper for _, _, upper in partition_bounds(conn) if upper is not None]
+        start = max(uppers) if uppers else _month_start(now or datetime.utcnow())
+        while start < target:
+            end = _add_months(start, 1)
+            name = f"audit_events_y{start:%Y}m{start:%m}"
+            _create_partition(conn, name, start, end)
+            created.append(name)
+            start = end
+    return created
+
+
+def _export_partition(name: str, archive_dir: str) -> str:
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    partial = f"{path}.partial"
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        with gzip.open(partial, "wb") as handle:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", handle)
+        raw.commit()
+    finally:
+        raw.close()
+    os.replace(partial, path)
+    return path
+
+
+def archive_audit_partitions(
+    retention_months: int,
+    archive_dir: str,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    if retention_months <= 0:
+        return []
+    cutoff = _add_months(_month_start(now or datetime.utcnow()), -retention_months)
+    with engine.connect() as conn:
+        expired = [name for name, _, upper in partition_bounds(conn) if upper is not None and upper <= cutoff]
+    archived = []
+    for name in sorted(expired):
+        path = _export_partition(name, archive_dir)
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE audit_events DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        archived.append(path)
+    return archived
+
+
+def maintain_audit_partitions() -> None:
+    ensure_audit_partitions(settings.AUDIT_PARTITION_MONTHS_AHEAD)
+    archive_audit_partitions(settings.AUDIT_RETENTION_MONTHS, settings.AUDIT_ARCHIVE_DIR)
@@ -1,44 +1,110 @@
-from typing import Callable, List
+from typing import Any, Callable, Dict, List, Optional
 
 import pyotp
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.principals import get_user_role_names, load_principal
 from app.core.security import decode_access_token
-from app.db import get_db
-from app.models import Role, User
+from app.db import get_async_db, get_db
+from app.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def _get_user_roles(db: Session, user: User) -> List[str]:
-    roles = db.query(Role.name).join(Role.users).filter(User.id == user.id).all()
-    return [role.name for role in roles]
-
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def decode_access_claims(token: str) -> Dict[str, Any]:
     try:
         payload = decode_access_token(token)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    if payload.get("type") != "access":
+    if payload.get("type") != "access" or not payload.get("sub"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return payload
+
+
+def authenticate_claims(db: Session, claims: Dict[str, Any]) -> User:
+    user = load_principal(db, int(claims["sub"]))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
 
 
+async def authenticate_claims_async(db: AsyncSession, claims: Dict[str, Any]) -> User:
+    user = await db.run_sync(load_principal, int(claims["sub"]))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
+
+
+def authenticate_token(db: Session, token: str) -> User:
+    return authenticate_claims(db, decode_access_claims(token))
+
+
+def get_access_claims(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    return decode_access_claims(token)
+
+
+def get_current_user(claims: Dict[str, Any] = Depends(get_access_claims), db: Session = Depends(get_db)) -> User:
+    return authenticate_claims(db, claims)
+
+
+async def get_current_user_async(
+    claims: Dict[str, Any] = Depends(get_access_claims),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    return await authenticate_claims_async(db, claims)
+
+
+def _claims_current(user: User, claims: Dict[str, Any]) -> bool:
+    return "rv" in claims and claims["rv"] == user.role_version
+
+
+def claim_role_names(user: User, claims: Dict[str, Any]) -> Optional[List[str]]:
+    if not _claims_current(user, claims) or not isinstance(claims.get("roles"), list):
+        return None
+    return claims["roles"]
+
+
+def current_role_names(db: Session, user: User, claims: Dict[str, Any]) -> List[str]:
+    roles = claim_role_names(user, claims)
+    return roles if roles is not None else get_user_role_names(db, user)
+
+
+async def current_role_names_async(db: AsyncSession, user: User, claims: Dict[str, Any]) -> List[str]:
+    roles = claim_role_names(user, claims)
+    return roles if roles is not None else await db.run_sync(get_user_role_names, user)
+
+
+def is_admin_principal(user: User, claims: Dict[str, Any]) -> bool:
+    if _claims_current(user, claims) and "adm" in claims:
+        return bool(claims["adm"])
+    return bool(user.is_admin)
+
+
 def require_auth(user: User = Depends(get_current_user)) -> User:
     return user
 
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
-    if not user.is_admin:
+def require_admin(
+    user: User = Depends(get_current_user),
+    claims: Dict[str, Any] = Depends(get_access_claims),
+) -> User:
+    if not is_admin_principal(user, claims):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return user
+
+
+def require_auth_async(user: User = Depends(get_current_user_async)) -> User:
+    return user
+
+
+def require_admin_async(
+    user: User = Depends(get_current_user_async),
+    claims: Dict[str, Any] = Depends(get_access_claims),
+) -> User:
+    if not is_admin_principal(user, claims):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
     return user
 
@@ -46,26 +112,38 @@ def require_admin(user: User = Depends(get_current_user)) -> User:
 def require_role(role_name: str) -> Callable:
     def _require_role(
         user: User = Depends(get_current_user),
+        claims: Dict[str, Any] = Depends(get_access_claims),
         db: Session = Depends(get_db),
     ) -> User:
-        roles = _get_user_roles(db, user)
-        if role_name not in roles and not user.is_admin:
+        if is_admin_principal(user, claims):
+            return user
+        if role_name not in current_role_names(db, user, claims):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing role")
         return user
 
     return _require_role
 
 
-def require_admin_mfa(
-    user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
-    x_mfa_totp: str | None = Header(default=None, alias="X-MFA-TOTP"),
-) -> User:
+def _verify_mfa(user: User, code: Optional[str]) -> User:
     if not user.mfa_enabled or not user.mfa_secret:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="MFA not enabled")
-    if not x_mfa_totp:
+    if not code:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="MFA code required")
     totp = pyotp.TOTP(user.mfa_secret)
-    if not totp.verify(x_mfa_totp, valid_window=1):
+    if not totp.verify(code, valid_window=1):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid MFA code")
     return user
+
+
+def require_admin_mfa(
+    user: User = Depends(require_admin),
+    x_mfa_totp: str | None = Header(default=None, alias="X-MFA-TOTP"),
+) -> User:
+    return _verify_mfa(user, x_mfa_totp)
+
+
+def require_admin_mfa_async(
+    user: User = Depends(require_admin_async),
+    x_mfa_totp: str | None = Header(default=None, alias="X-MFA-TOTP"),
+) -> User:
+    return _verify_mfa(user, x_mfa_totp)
@@ -0,0 +1,130 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.security import hash_password, verify_and_update_password
+
+
+class PasswordPoolSaturated(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, rounds: int, timeout: float) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.timeout = timeout
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolSaturated()
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def _submit(self, executor: ProcessPoolExecutor, func: Callable[..., Any], *args: Any) -> Future:
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        executor = self._get_executor()
+        self._acquire()
+        if executor is None:
+            try:
+                return func(*args)
+            finally:
+                self._release()
+        future = self._submit(executor, func, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.timed_out += 1
+            raise PasswordPoolSaturated()
+
+    async def _run_async(self, func: Callable[..., Any], *args: Any) -> Any:
+        executor = self._get_executor()
+        self._acquire()
+        if executor is None:
+            try:
+                return await asyncio.to_thread(func, *args)
+            finally:
+                self._release()
+        future = self._submit(executor, func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.timed_out += 1
+            raise PasswordPoolSaturated()
+
+    def hash(self, password: str) -> str:
+        return self._run(hash_password, password, self.rounds)
+
+    def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return self._run(verify_and_update_password, password, hashed_password, self.rounds)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(hash_password, password, self.rounds)
+
+    async def verify_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run_async(verify_and_update_password, password, hashed_password, self.rounds)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "in_flight": pending,
+            "queue_depth": max(0, pending - max(self.workers, 1)),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.BCRYPT_ROUNDS,
+    timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,153 @@
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.db import engine
+from app.models import Role, User
+
+NOTIFY_CHANNEL = "pam_principal"
+CACHED_COLUMNS = ("id", "email", "mfa_secret", "mfa_enabled", "is_admin", "created_at", "role_version")
+
+CacheEntry = Tuple[float, Dict[str, Any], List[str]]
+
+
+class PrincipalCache:
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._watchers: Set[Callable[[Optional[int]], None]] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, user_id: int) -> Optional[CacheEntry]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry
+
+    def put(self, user_id: int, columns: Dict[str, Any], roles: List[str]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, columns, roles)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+            watchers = list(self._watchers)
+        for watcher in watchers:
+            watcher(user_id)
+
+    def watch(self, watcher: Callable[[Optional[int]], None]) -> None:
+        with self._lock:
+            self._watchers.add(watcher)
+
+    def unwatch(self, watcher: Callable[[Optional[int]], None]) -> None:
+        with self._lock:
+            self._watchers.discard(watcher)
+
+    def start_listener(self) -> None:
+        if not self.enabled or self._listener is not None:
+            return
+        self._stopped.clear()
+        self._listener = threading.Thread(target=self._listen, name="principal-invalidation", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self) -> None:
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+            self._listener = None
+
+    def _listen(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                raw = engine.raw_connection()
+            except Exception:
+                self._stopped.wait(5)
+                continue
+            try:
+                connection = raw.driver_connection
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                self.invalidate()
+                while not self._stopped.is_set():
+                    if select.select([connection], [], [], 5) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        payload = connection.notifies.pop(0).payload
+                        self.invalidate(int(payload) if payload.isdigit() else None)
+            except Exception:
+                self.invalidate()
+                self._stopped.wait(1)
+            finally:
+                try:
+                    raw.invalidate()
+                except Exception:
+                    pass
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_SIZE,
+)
+
+
+def _query_role_names(db: Session, user_id: int) -> List[str]:
+    roles = db.query(Role.name).join(Role.users).filter(User.id == user_id).all()
+    return [role.name for role in roles]
+
+
+def load_principal(db: Session, user_id: int) -> Optional[User]:
+    entry = principal_cache.get(user_id)
+    if entry is not None:
+        columns = entry[1]
+    else:
+        row = db.query(*[getattr(User, name) for name in CACHED_COLUMNS]).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        columns = row._asdict()
+        principal_cache.put(user_id, columns, _query_role_names(db, user_id))
+    user = User(**columns)
+    make_transient_to_detached(user)
+    return user
+
+
+def get_user_role_names(db: Session, user: User) -> List[str]:
+    entry = principal_cache.get(user.id)
+    if entry is not None:
+        return list(entry[2])
+    return _query_role_names(db, user.id)
+
+
+def notify_principal_changed(db: Session, user_id: int) -> None:
+    principal_cache.invalidate(user_id)
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": str(user_id)})
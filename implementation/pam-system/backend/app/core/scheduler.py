@@ -0,0 +1,192 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db import engine
+
+LEADER_LOCK_KEY = 7310002
+RUNNER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderElection:
+    def __init__(self, lock_key: int) -> None:
+        self.lock_key = lock_key
+        self._conn: Optional[Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._conn is not None
+
+    def _drop(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.invalidate()
+                conn.close()
+            except Exception:
+                pass
+
+    def check(self) -> bool:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute(text("SELECT 1"))
+                    return True
+                except Exception:
+                    self._drop()
+            try:
+                conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            except Exception:
+                return False
+            try:
+                acquired = conn.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"),
+                    {"key": self.lock_key},
+                ).scalar()
+            except Exception:
+                conn.close()
+                return False
+            if not acquired:
+                conn.close()
+                return False
+            self._conn = conn
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+            except Exception:
+                pass
+            self._conn.close()
+            self._conn = None
+
+
+class ScheduledJob:
+    def __init__(self, name: str, func: Callable[[], Any], interval: float) -> None:
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.anchor: Optional[float] = None
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_started_at: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.max_duration_ms = 0.0
+        self.last_lag_ms: Optional[float] = None
+
+    def lag_ms(self, started: float) -> float:
+        if self.anchor is None:
+            return 0.0
+        elapsed = max(0.0, started - self.anchor)
+        scheduled = self.anchor + (elapsed // self.interval) * self.interval
+        return (started - scheduled) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_s": self.interval,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "last_started_at": self.last_started_at,
+            "last_duration_ms": self.last_duration_ms,
+            "max_duration_ms": round(self.max_duration_ms, 1),
+            "last_lag_ms": self.last_lag_ms,
+        }
+
+
+class LeaderScheduler:
+    def __init__(self, election: LeaderElection) -> None:
+        self.election = election
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._scheduler = BackgroundScheduler()
+
+    def add_job(self, name: str, func: Callable[[], Any], seconds: float, run_now: bool = False) -> None:
+        job = ScheduledJob(name, func, seconds)
+        self.jobs[name] = job
+        options: Dict[str, Any] = {"next_run_time": datetime.now()} if run_now else {}
+        scheduled = self._scheduler.add_job(self._run, "interval", seconds=seconds, args=[job], id=name, **options)
+        job.anchor = time.time() if run_now else scheduled.trigger.start_date.timestamp()
+
+    def _record(self, job: ScheduledJob, started: float, status: str, error: Optional[str]) -> None:
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "INSERT INTO scheduler_job_runs "
+                        "(job_name, runner, started_at, duration_ms, lag_ms, status, error) "
+                        "VALUES (:name, :runner, :started_at, :duration_ms, :lag_ms, :status, :error) "
+                        "ON CONFLICT (job_name) DO UPDATE SET runner = EXCLUDED.runner, "
+                        "started_at = EXCLUDED.started_at, duration_ms = EXCLUDED.duration_ms, "
+                        "lag_ms = EXCLUDED.lag_ms, status = EXCLUDED.status, error = EXCLUDED.error"
+                    ),
+                    {
+                        "name": job.name,
+                        "runner": RUNNER_ID,
+                        "started_at": datetime.utcfromtimestamp(started),
+                        "duration_ms": job.last_duration_ms,
+                        "lag_ms": job.last_lag_ms,
+                        "status": status,
+                        "error": error,
+                    },
+                )
+        except Exception:
+            pass
+
+    def _run(self, job: ScheduledJob) -> None:
+        started = time.time()
+        if not self.election.check():
+            job.skipped += 1
+            return
+        job.last_started_at = started
+        job.last_lag_ms = round(job.lag_ms(started), 1)
+        status, error = "ok", None
+        try:
+            job.func()
+        except Exception as exc:
+            job.failures += 1
+            status, error = "failed", f"{type(exc).__name__}: {exc}"
+        finally:
+            job.runs += 1
+            job.last_duration_ms = round((time.time() - started) * 1000, 1)
+            job.max_duration_ms = max(job.max_duration_ms, job.last_duration_ms)
+        self._record(job, started, status, error)
+
+    def start(self) -> None:
+        self._scheduler.start()
+
+    def shutdown(self) -> None:
+        self._scheduler.shutdown()
+        self.election.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runner": RUNNER_ID,
+            "leader": self.election.is_leader,
+            "jobs": {name: job.stats() for name, job in self.jobs.items()},
+        }
+
+
+def cluster_job_runs(conn) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        text(
+            "SELECT job_name, runner, started_at, duration_ms, lag_ms, status, error, "
+            "EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC' - started_at)) AS age_s "
+            "FROM scheduler_job_runs ORDER BY job_name"
+        )
+    ).mappings()
+    return [dict(row) for row in rows]
+
+
+scheduler = LeaderScheduler(LeaderElection(LEADER_LOCK_KEY))
@@ -1,18 +1,42 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=None)
+def password_context(rounds: int) -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+
+pwd_context = password_context(settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+    rounds: int,
+) -> Tuple[bool, Optional[str]]:
+    return password_context(rounds).verify_and_update(plain_password, hashed_password)
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return password_context(rounds).hash(password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -31,6 +55,13 @@ def create_access_token(subject: str, extra: Dict[str, Any] | None = None) -> st
     return _encode_token(payload, settings.JWT_SECRET, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRES_MINUTES))
 
 
+def create_user_access_token(user_id: int, roles: List[str], is_admin: bool, role_version: int) -> str:
+    return create_access_token(
+        str(user_id),
+        {"roles": sorted(roles), "adm": bool(is_admin), "rv": role_version},
+    )
+
+
 def create_refresh_token(subject: str) -> str:
     payload = {"sub": subject, "type": "refresh"}
     return _encode_token(payload, settings.JWT_REFRESH_SECRET, timedelta(days=settings.REFRESH_TOKEN_EXPIRES_DAYS))
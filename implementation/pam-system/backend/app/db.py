@@ -1,14 +1,149 @@
 import os
+import re
+import threading
 import time
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator
 
-from sqlalchemy import create_engine, text
+from greenlet import getcurrent
+from sqlalchemy import create_engine, exc, make_url, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+class PoolMetrics:
+    WAIT_BUCKETS_MS = (1, 10, 100, 1000)
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_events = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(self.WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool) -> None:
+        millis = seconds * 1000
+        bucket = next((i for i, bound in enumerate(self.WAIT_BUCKETS_MS) if millis < bound), len(self.WAIT_BUCKETS_MS))
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[bucket] += 1
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflow_events += 1
+
+    def snapshot(self, pool: QueuePool) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            labels = [f"<{bound}ms" for bound in self.WAIT_BUCKETS_MS] + [f">={self.WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "overflow_events": self.overflow_events,
+                "wait_avg_ms": round(1000 * self.wait_total / attempts, 3) if attempts else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max, 3),
+                "wait_histogram": dict(zip(labels, self.wait_buckets)),
+            }
+
+
+class _InstrumentedPool:
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._connect_time: Dict[Any, float] = {}
+
+    def _do_get(self):
+        current = getcurrent()
+        if current in self._connect_time:
+            return super()._do_get()
+        self._connect_time[current] = 0.0
+        began = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - began - self._connect_time[current], True)
+            raise
+        finally:
+            connecting = self._connect_time.pop(current)
+        self.metrics.record_wait(time.perf_counter() - began - connecting, False)
+        return record
+
+    def _create_connection(self):
+        began = time.perf_counter()
+        try:
+            record = super()._create_connection()
+        finally:
+            current = getcurrent()
+            if current in self._connect_time:
+                self._connect_time[current] += time.perf_counter() - began
+        if self.overflow() > 0:
+            self.metrics.record_overflow()
+        return record
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+
+
+def _async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+    }
+
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    connect_args={"application_name": settings.DB_APPLICATION_NAME},
+    **_pool_options(),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(
+    _async_database_url(),
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    connect_args={
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "server_settings": {"application_name": f"{settings.DB_APPLICATION_NAME}-async"},
+    },
+    **_pool_options(),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+MIGRATION_LOCK_KEY = 7310001
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+CONCURRENT_INDEX_RE = re.compile(r"CREATE\s+INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE)
 
 
 def get_db() -> Generator:
@@ -19,16 +154,113 @@ def get_db() -> Generator:
         db.close()
 
 
-def run_migrations() -> None:
-    base_dir = os.path.dirname(__file__)
-    migration_path = os.path.join(base_dir, "..", "migrations", "001_init.sql")
-    with open(migration_path, "r", encoding="utf-8") as handle:
-        sql = handle.read()
-    statements = [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
-    wait_for_db()
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_stats() -> Dict[str, Any]:
+    return {
+        "sync": InstrumentedQueuePool.metrics.snapshot(engine.pool),
+        "async": InstrumentedAsyncQueuePool.metrics.snapshot(async_engine.sync_engine.pool),
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+
+
+def server_connection_stats(db) -> Dict[str, Any]:
+    max_connections = int(db.execute(text("SHOW max_connections")).scalar())
+    rows = db.execute(
+        text(
+            "SELECT COALESCE(NULLIF(application_name, ''), backend_type) AS name, count(*) AS connections "
+            "FROM pg_stat_activity WHERE datname = current_database() GROUP BY 1 ORDER BY 2 DESC"
+        )
+    ).all()
+    return {
+        "max_connections": max_connections,
+        "connections": sum(row.connections for row in rows),
+        "by_application": {row.name: row.connections for row in rows},
+    }
+
+
+def _split_statements(sql: str) -> list[str]:
+    statements = []
+    current = []
+    in_body = False
+    for part in sql.split("$$"):
+        if in_body:
+            current.append(f"$${part}$$")
+        else:
+            pieces = part.split(";")
+            current.append(pieces[0])
+            for piece in pieces[1:]:
+                statements.append("".join(current))
+                current = [piece]
+        in_body = not in_body
+    statements.append("".join(current))
+    return [stmt.strip() for stmt in statements if stmt.strip()]
+
+
+def _drop_invalid_indexes(conn, statements: list[str]) -> None:
+    for statement in statements:
+        match = CONCURRENT_INDEX_RE.search(statement)
+        if not match:
+            continue
+        invalid = conn.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": match.group(1)},
+        ).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {match.group(1)}"))
+
+
+def _apply_migration(version: str, sql: str) -> None:
+    statements = _split_statements(sql)
+    record = text("INSERT INTO schema_migrations (version) VALUES (:version)")
+    if NO_TRANSACTION_MARKER in sql:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            _drop_invalid_indexes(conn, statements)
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(record, {"version": version})
+        return
     with engine.begin() as conn:
         for statement in statements:
             conn.execute(text(statement))
+        conn.execute(record, {"version": version})
+
+
+def _acquire_migration_lock(conn, poll_interval: float = 0.5) -> None:
+    query = text("SELECT pg_try_advisory_lock(:key)")
+    while not conn.execute(query, {"key": MIGRATION_LOCK_KEY}).scalar():
+        time.sleep(poll_interval)
+
+
+def run_migrations() -> None:
+    migrations_dir = os.path.join(os.path.dirname(__file__), "..", "migrations")
+    wait_for_db()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        _acquire_migration_lock(lock_conn)
+        try:
+            lock_conn.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                    "version VARCHAR(255) PRIMARY KEY, applied_at TIMESTAMP NOT NULL DEFAULT NOW())"
+                )
+            )
+            applied = {row[0] for row in lock_conn.execute(text("SELECT version FROM schema_migrations"))}
+            for name in sorted(os.listdir(migrations_dir)):
+                if not name.endswith(".sql"):
+                    continue
+                version = name[:-4]
+                if version in applied:
+                    continue
+                with open(os.path.join(migrations_dir, name), "r", encoding="utf-8") as handle:
+                    _apply_migration(version, handle.read())
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
 
 
 def wait_for_db(retries: int = 20, delay: float = 1.5) -> None:
@@ -0,0 +1,143 @@
+import asyncio
+import base64
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.recordings import (
+    binary_recording_path,
+    read_binary_chunks,
+    read_command_lines,
+    read_index,
+    read_log_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return -1
+
+
+class SessionFollower:
+    def __init__(self, session_id: int, recording_file: str, cmd_path: str) -> None:
+        self.session_id = session_id
+        self.recording_file = recording_file
+        self.rec_path = binary_recording_path(recording_file)
+        self.cmd_path = cmd_path
+        self.subscribers: Set[WebSocket] = set()
+        self.output_file, binary = self._output_path()
+        self.output_offset = self._tail_offset(self.output_file, binary) if self.output_file else 0
+        self.cmd_offset = max(_file_size(cmd_path), 0)
+        self.task: Optional[asyncio.Task] = None
+
+    def _output_path(self) -> Tuple[Optional[str], bool]:
+        if os.path.exists(self.recording_file):
+            return self.recording_file, False
+        if os.path.exists(self.rec_path):
+            return self.rec_path, True
+        return None, False
+
+    def _tail_offset(self, path: str, binary: bool) -> int:
+        if binary:
+            index = read_index(path)
+            if index:
+                return index[-1][2]
+        return max(_file_size(path), 0)
+
+    def _read_new(self, limit: int) -> List[Dict[str, Any]]:
+        messages: List[Dict[str, Any]] = []
+        output_file, output_offset, cmd_offset = self.output_file, self.output_offset, self.cmd_offset
+        output_path, binary = self._output_path()
+        if output_path is not None:
+            if output_path != output_file:
+                if output_file is not None:
+                    output_offset = max(_file_size(output_path), 0)
+                output_file = output_path
+            if _file_size(output_path) > output_offset:
+                reader = read_binary_chunks if binary else read_log_chunks
+                records, output_offset, _ = reader(output_path, output_offset, limit)
+                messages.extend(
+                    {"type": "output", "ts": ts, "data": base64.b64encode(data).decode("ascii")}
+                    for ts, data in records
+                )
+        if _file_size(self.cmd_path) > cmd_offset:
+            entries, cmd_offset = read_command_lines(self.cmd_path, cmd_offset, limit)
+            messages.extend(
+                {"type": "command", "ts": payload["ts"], "line": payload["line"], "offset": offset}
+                for offset, payload in entries
+            )
+        self.output_file, self.output_offset, self.cmd_offset = output_file, output_offset, cmd_offset
+        return messages
+
+    async def _send(self, websocket: WebSocket, messages: List[Dict[str, Any]]) -> None:
+        try:
+            for message in messages:
+                await websocket.send_json({"session_id": self.session_id, **message})
+        except Exception:
+            self.subscribers.discard(websocket)
+
+    async def _close_all(self, code: int) -> None:
+        subscribers = list(self.subscribers)
+        self.subscribers.clear()
+        for websocket in subscribers:
+            try:
+                await websocket.close(code=code)
+            except Exception:
+                pass
+
+    async def run(self) -> None:
+        interval = settings.LIVE_TAIL_POLL_MS / 1000
+        failures = 0
+        while self.subscribers:
+            try:
+                messages = await asyncio.to_thread(self._read_new, settings.LIVE_TAIL_BATCH)
+            except Exception:
+                failures += 1
+                logger.exception(
+                    "Live tail of session %s failed (%d/%d)", self.session_id, failures, settings.LIVE_TAIL_MAX_ERRORS
+                )
+                if failures >= settings.LIVE_TAIL_MAX_ERRORS:
+                    await self._close_all(1011)
+                    return
+                await asyncio.sleep(interval)
+                continue
+            failures = 0
+            if messages:
+                await asyncio.gather(*(self._send(ws, messages) for ws in list(self.subscribers)))
+            await asyncio.sleep(interval)
+
+
+class LiveSessionHub:
+    def __init__(self) -> None:
+        self.followers: Dict[int, SessionFollower] = {}
+
+    def subscribe(self, websocket: WebSocket, session_id: int, recording_file: str, cmd_path: str) -> None:
+        follower = self.followers.get(session_id)
+        if follower is None:
+            follower = SessionFollower(session_id, recording_file, cmd_path)
+            self.followers[session_id] = follower
+        follower.subscribers.add(websocket)
+        if follower.task is None or follower.task.done():
+            follower.task = asyncio.create_task(self._run(follower))
+
+    def unsubscribe(self, websocket: WebSocket, session_id: int) -> None:
+        follower = self.followers.get(session_id)
+        if follower is not None:
+            follower.subscribers.discard(websocket)
+
+    async def _run(self, follower: SessionFollower) -> None:
+        try:
+            await follower.run()
+        finally:
+            if not follower.subscribers and self.followers.get(follower.session_id) is follower:
+                del self.followers[follower.session_id]
+
+
+live_hub = LiveSessionHub()
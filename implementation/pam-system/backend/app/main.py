@@ -1,13 +1,19 @@
 from datetime import datetime
 
-from apscheduler.schedulers.background import BackgroundScheduler
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
-from app.db import SessionLocal, run_migrations
+from app.core.audit import audit_buffer
+from app.core.audit_partitions import maintain_audit_partitions
+from app.core.passwords import password_hasher
+from app.core.principals import principal_cache
+from app.core.scheduler import scheduler
+from app.db import SessionLocal, async_engine, run_migrations
 from app.models import JitRequest
-from app.routes import assets, audit, auth, jit, roles, sessions, updates
+from app.routes import assets, audit, auth, jit, metrics, roles, sessions, updates
+from app.vault import vault_client
+from app.ws import manager
 
 app = FastAPI(title="PAM Backend", version="0.1.0")
 
@@ -26,9 +32,7 @@ app.include_router(sessions.router)
 app.include_router(audit.router)
 app.include_router(roles.router)
 app.include_router(updates.router)
-
-scheduler = BackgroundScheduler()
-
+app.include_router(metrics.router)
 
 def expire_jit_requests() -> None:
     db: Session = SessionLocal()
@@ -53,10 +57,27 @@ def expire_jit_requests() -> None:
 @app.on_event("startup")
 def on_startup() -> None:
     run_migrations()
-    scheduler.add_job(expire_jit_requests, "interval", minutes=1)
+    principal_cache.start_listener()
+    scheduler.add_job("expire_jit_requests", expire_jit_requests, seconds=60)
+    scheduler.add_job("maintain_audit_partitions", maintain_audit_partitions, seconds=6 * 3600, run_now=True)
     scheduler.start()
 
 
+@app.on_event("startup")
+async def start_updates_bus() -> None:
+    await manager.start()
+
+
+@app.on_event("shutdown")
+async def stop_updates_bus() -> None:
+    await manager.stop()
+    await async_engine.dispose()
+
+
 @app.on_event("shutdown")
 def on_shutdown() -> None:
     scheduler.shutdown()
+    audit_buffer.shutdown()
+    principal_cache.stop_listener()
+    password_hasher.shutdown()
+    vault_client.close()
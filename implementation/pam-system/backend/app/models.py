@@ -17,6 +17,7 @@ class User(Base):
     mfa_enabled = Column(Boolean, default=False)
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    role_version = Column(Integer, nullable=False, default=0)
 
     roles = relationship("Role", secondary="user_roles", back_populates="users")
 
@@ -95,6 +96,6 @@ class AuditEvent(Base):
     action = Column(String(100), nullable=False)
     resource_type = Column(String(100), nullable=False)
     resource_id = Column(String(100), nullable=False)
-    ts = Column(DateTime, default=datetime.utcnow)
+    ts = Column(DateTime, default=datetime.utcnow, nullable=False)
     ip = Column(String(50), nullable=True)
     metadata_json = Column(JSONB, nullable=True)
@@ -0,0 +1,343 @@
+import base64
+import bisect
+import json
+import os
+import struct
+import zlib
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+MAGIC = b"PAMREC\x01\n"
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+BLOCK_HEADER = struct.Struct(">BII")
+RECORD_HEADER = struct.Struct(">dI")
+INDEX_ENTRY = struct.Struct(">ddQ")
+
+IndexEntry = Tuple[float, float, int]
+
+
+def binary_recording_path(log_path: str) -> str:
+    base = log_path[:-4] if log_path.endswith(".log") else log_path
+    return f"{base}.rec"
+
+
+def index_path(rec_path: str) -> str:
+    return f"{rec_path}.idx"
+
+
+def read_index(rec_path: str) -> Optional[List[IndexEntry]]:
+    path = index_path(rec_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as handle:
+        raw = handle.read()
+    usable = len(raw) - len(raw) % INDEX_ENTRY.size
+    return [entry for entry in INDEX_ENTRY.iter_unpack(raw[:usable])]
+
+
+def _read_block(handle: BinaryIO) -> Optional[bytes]:
+    header = handle.read(BLOCK_HEADER.size)
+    if len(header) < BLOCK_HEADER.size:
+        return None
+    codec, raw_len, stored_len = BLOCK_HEADER.unpack(header)
+    stored = handle.read(stored_len)
+    if len(stored) < stored_len:
+        return None
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(stored)
+    if codec == CODEC_NONE:
+        return stored
+    raise ValueError(f"Unknown recording block codec: {codec}")
+
+
+def _iter_block_records(block: bytes) -> Iterator[Tuple[float, bytes]]:
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(block):
+        ts, length = RECORD_HEADER.unpack_from(block, offset)
+        offset += RECORD_HEADER.size
+        yield ts, block[offset : offset + length]
+        offset += length
+
+
+def iter_records(
+    rec_path: str,
+    from_ts: Optional[float] = None,
+    to_ts: Optional[float] = None,
+) -> Iterator[Tuple[float, bytes]]:
+    index = read_index(rec_path)
+    with open(rec_path, "rb") as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a binary session recording")
+        if index and from_ts is not None:
+            position = bisect.bisect_left([entry[1] for entry in index], from_ts)
+            if position >= len(index):
+                return
+            handle.seek(index[position][2])
+        while True:
+            block = _read_block(handle)
+            if block is None:
+                return
+            for ts, data in _iter_block_records(block):
+                if from_ts is not None and ts < from_ts:
+                    continue
+                if to_ts is not None and ts > to_ts:
+                    return
+                yield ts, data
+
+
+def iter_json_lines(records: Iterator[Tuple[float, bytes]]) -> Iterator[bytes]:
+    for ts, data in records:
+        payload = {"ts": ts, "data": base64.b64encode(data).decode("ascii")}
+        yield (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def iter_log_records(
+    log_path: str,
+    from_ts: Optional[float] = None,
+    to_ts: Optional[float] = None,
+) -> Iterator[Tuple[float, bytes]]:
+    with open(log_path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json.loads(line)
+                ts = float(payload["ts"])
+                data = base64.b64decode(payload["data"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if from_ts is not None and ts < from_ts:
+                continue
+            if to_ts is not None and ts > to_ts:
+                return
+            yield ts, data
+
+
+class BinaryRecordingWriter:
+    def __init__(self, rec_path: str, codec: int = CODEC_ZLIB) -> None:
+        self.codec = codec
+        self.handle = open(rec_path, "wb")
+        self.index_handle = open(index_path(rec_path), "wb")
+        self.handle.write(MAGIC)
+
+    def write_block(self, records: List[Tuple[float, bytes]]) -> None:
+        if not records:
+            return
+        raw = b"".join(RECORD_HEADER.pack(ts, len(data)) + data for ts, data in records)
+        stored = zlib.compress(raw) if self.codec == CODEC_ZLIB else raw
+        offset = self.handle.tell()
+        self.handle.write(BLOCK_HEADER.pack(self.codec, len(raw), len(stored)) + stored)
+        self.index_handle.write(INDEX_ENTRY.pack(records[0][0], records[-1][0], offset))
+
+    def close(self) -> None:
+        self.handle.close()
+        self.index_handle.close()
+
+
+def convert_log_recording(
+    log_path: str,
+    rec_path: Optional[str] = None,
+    codec: int = CODEC_ZLIB,
+    block_bytes: int = 65536,
+) -> Tuple[str, int]:
+    rec_path = rec_path or binary_recording_path(log_path)
+    writer = BinaryRecordingWriter(rec_path, codec=codec)
+    block: List[Tuple[float, bytes]] = []
+    block_size = 0
+    count = 0
+    try:
+        for ts, data in iter_log_records(log_path):
+            block.append((ts, data))
+            block_size += len(data)
+            count += 1
+            if block_size >= block_bytes:
+                writer.write_block(block)
+                block, block_size = [], 0
+        writer.write_block(block)
+    finally:
+        writer.close()
+    return rec_path, count
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            suffix = int(end_text)
+            if suffix <= 0:
+                return None
+            start = max(0, size - suffix)
+            end = size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = 65536) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(chunk_size, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def iter_gzip(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def read_log_chunks(log_path: str, offset: int, limit: int) -> Tuple[List[Tuple[float, bytes]], int, bool]:
+    records: List[Tuple[float, bytes]] = []
+    with open(log_path, "rb") as handle:
+        handle.seek(offset)
+        while len(records) < limit:
+            line = handle.readline()
+            if not line:
+                return records, offset, True
+            if not line.endswith(b"\n"):
+                return records, offset, False
+            offset += len(line)
+            try:
+                payload = json.loads(line)
+                records.append((float(payload["ts"]), base64.b64decode(payload["data"])))
+            except (ValueError, KeyError, TypeError):
+                continue
+        eof = not handle.read(1)
+    return records, offset, eof
+
+
+def _is_block_start(handle: BinaryIO, index: List[IndexEntry], offset: int) -> bool:
+    if offset == len(MAGIC) or offset in {entry[2] for entry in index}:
+        return True
+    position = index[-1][2] if index else len(MAGIC)
+    if offset < position:
+        return False
+    handle.seek(position)
+    while position < offset:
+        header = handle.read(BLOCK_HEADER.size)
+        if len(header) < BLOCK_HEADER.size:
+            return True
+        position += BLOCK_HEADER.size + BLOCK_HEADER.unpack(header)[2]
+        handle.seek(position)
+    return position == offset
+
+
+def read_binary_chunks(rec_path: str, offset: int, limit: int) -> Tuple[List[Tuple[float, bytes]], int, bool]:
+    records: List[Tuple[float, bytes]] = []
+    with open(rec_path, "rb") as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a binary session recording")
+        offset = max(offset, len(MAGIC))
+        index = read_index(rec_path)
+        if index is not None and not _is_block_start(handle, index, offset):
+            raise ValueError("Offset does not start a recording block")
+        handle.seek(offset)
+        while len(records) < limit:
+            block = _read_block(handle)
+            if block is None:
+                return records, offset, True
+            offset = handle.tell()
+            records.extend(_iter_block_records(block))
+        eof = not handle.read(1)
+    return records, offset, eof
+
+
+def _parse_command_line(raw: bytes) -> Optional[dict]:
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or "ts" not in payload or "line" not in payload:
+        return None
+    return payload
+
+
+def read_command_tail(
+    path: str,
+    limit: int,
+    before_offset: Optional[int] = None,
+    block_size: int = 8192,
+) -> List[Tuple[int, dict]]:
+    entries: List[Tuple[int, dict]] = []
+    with open(path, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        if before_offset is not None:
+            position = min(position, before_offset)
+        remainder = b""
+        while position > 0 and len(entries) < limit:
+            read_size = min(block_size, position)
+            position -= read_size
+            handle.seek(position)
+            parts = (handle.read(read_size) + remainder).split(b"\n")
+            remainder = parts[0]
+            line_end = position + len(parts[0])
+            complete = []
+            for part in parts[1:]:
+                complete.append((line_end + 1, part))
+                line_end += 1 + len(part)
+            for offset, part in reversed(complete):
+                payload = _parse_command_line(part)
+                if payload is not None:
+                    entries.append((offset, payload))
+                    if len(entries) >= limit:
+                        break
+        if position == 0 and len(entries) < limit:
+            payload = _parse_command_line(remainder)
+            if payload is not None:
+                entries.append((0, payload))
+    entries.reverse()
+    return entries
+
+
+def read_command_after(path: str, after_offset: int, limit: int) -> List[Tuple[int, dict]]:
+    with open(path, "rb") as handle:
+        handle.seek(after_offset)
+        start = after_offset + len(handle.readline())
+    entries, _ = read_command_lines(path, start, limit)
+    return entries
+
+
+def command_log_path(recording_path: Optional[str], session_id: int, recordings_dir: str = "/data/recordings") -> str:
+    recording_name = os.path.basename(recording_path or "")
+    if recording_name.endswith(".log"):
+        base_name = recording_name[:-4]
+    else:
+        base_name = f"session-{session_id}"
+    return os.path.join(recordings_dir, f"{base_name}.cmd.log")
+
+
+def read_command_lines(path: str, offset: int, limit: int) -> Tuple[List[Tuple[int, dict]], int]:
+    entries: List[Tuple[int, dict]] = []
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        while len(entries) < limit:
+            line = handle.readline()
+            if not line.endswith(b"\n"):
+                break
+            payload = _parse_command_line(line)
+            if payload is not None:
+                entries.append((offset, payload))
+            offset += len(line)
+    return entries, offset
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from app.core.audit import create_audit_event
+from app.core.audit import record_audit_event
+from app.core.config import settings
 from app.core.deps import require_admin_mfa, require_auth
 from app.db import get_db
 from app.models import Asset, Credential
-from app.schemas import AssetCreate, AssetResponse, CredentialCreate
-from app.vault import ensure_kv_v2_mount, write_kv2
+from app.schemas import (
+    AssetCreate,
+    AssetResponse,
+    BulkCredentialFailure,
+    BulkCredentialImport,
+    BulkCredentialImportResponse,
+    CredentialCreate,
+)
+from app.vault import vault_client, write_kv2
 
 router = APIRouter(prefix="/assets", tags=["assets"])
 
@@ -25,9 +33,8 @@ def create_asset(
         type=payload.type,
     )
     db.add(asset)
-    db.commit()
-    db.refresh(asset)
-    create_audit_event(
+    db.flush()
+    record_audit_event(
         db,
         actor_id=user.id,
         action="asset_create",
@@ -35,6 +42,8 @@ def create_asset(
         resource_id=asset.id,
         ip=request.client.host if request.client else None,
     )
+    db.commit()
+    db.refresh(asset)
     return AssetResponse(
         id=asset.id,
         name=asset.name,
@@ -72,7 +81,6 @@ def create_credential(
     asset = db.query(Asset).filter(Asset.id == asset_id).first()
     if not asset:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
-    ensure_kv_v2_mount()
     vault_path = f"assets/{asset_id}"
     write_kv2(vault_path, {"username": payload.username, "password": payload.password})
     existing = db.query(Credential).filter(Credential.asset_id == asset_id).first()
@@ -82,8 +90,7 @@ def create_credential(
     else:
         credential = Credential(asset_id=asset_id, vault_path=vault_path)
         db.add(credential)
-    db.commit()
-    create_audit_event(
+    record_audit_event(
         db,
         actor_id=user.id,
         action="credential_write",
@@ -91,4 +98,65 @@ def create_credential(
         resource_id=asset_id,
         ip=request.client.host if request.client else None,
     )
+    db.commit()
     return {"vault_path": vault_path}
+
+
+@router.post("/credentials/bulk", response_model=BulkCredentialImportResponse)
+def import_credentials(
+    payload: BulkCredentialImport,
+    request: Request,
+    user=Depends(require_admin_mfa),
+    db: Session = Depends(get_db),
+) -> BulkCredentialImportResponse:
+    if len(payload.items) > settings.VAULT_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.VAULT_BULK_MAX_ITEMS} credentials per import",
+        )
+    items = {item.asset_id: item for item in payload.items}
+    known = {row.id for row in db.query(Asset.id).filter(Asset.id.in_(items)).all()}
+    failed = [
+        BulkCredentialFailure(asset_id=asset_id, detail="Asset not found")
+        for asset_id in items
+        if asset_id not in known
+    ]
+    writes = [
+        (f"assets/{asset_id}", {"username": item.username, "password": item.password})
+        for asset_id, item in items.items()
+        if asset_id in known
+    ]
+    errors = vault_client.write_many_kv2(writes, settings.VAULT_BULK_CONCURRENCY) if writes else {}
+    imported = []
+    for asset_id in items:
+        if asset_id not in known:
+            continue
+        error = errors.get(f"assets/{asset_id}")
+        if error:
+            failed.append(BulkCredentialFailure(asset_id=asset_id, detail=error))
+        else:
+            imported.append(asset_id)
+
+    existing = {
+        credential.asset_id: credential
+        for credential in db.query(Credential).filter(Credential.asset_id.in_(imported)).all()
+    }
+    client_ip = request.client.host if request.client else None
+    for asset_id in imported:
+        vault_path = f"assets/{asset_id}"
+        credential = existing.get(asset_id)
+        if credential:
+            credential.vault_path = vault_path
+        else:
+            db.add(Credential(asset_id=asset_id, vault_path=vault_path))
+        record_audit_event(
+            db,
+            actor_id=user.id,
+            action="credential_write",
+            resource_type="asset",
+            resource_id=asset_id,
+            ip=client_ip,
+            metadata={"bulk": True},
+        )
+    db.commit()
+    return BulkCredentialImportResponse(imported=imported, failed=failed)
@@ -1,68 +1,169 @@
-from typing import Optional
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import String, cast, func, or_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import require_admin
-from app.db import get_db
+from app.core.config import settings
+from app.core.deps import require_admin_async
+from app.db import get_async_db
 from app.models import AuditEvent
 from app.schemas import AuditEventResponse, AuditPageResponse
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
+SORT_KEYS = {
+    "ts_asc": (AuditEvent.ts, False),
+    "ts_desc": (AuditEvent.ts, True),
+    "action_asc": (AuditEvent.action, False),
+    "action_desc": (AuditEvent.action, True),
+    "resource_asc": (AuditEvent.resource_type, False),
+    "resource_desc": (AuditEvent.resource_type, True),
+}
+
+
+def _search_document():
+    return func.audit_search_document(
+        AuditEvent.action,
+        AuditEvent.resource_type,
+        AuditEvent.resource_id,
+        AuditEvent.actor_id,
+        AuditEvent.ip,
+        AuditEvent.metadata_json,
+    )
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filter_fingerprint(*filters: Any) -> str:
+    values = [item.isoformat() if isinstance(item, datetime) else item for item in filters]
+    raw = json.dumps(values, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_cursor(value: Any, event_id: int, sort: str, fingerprint: str) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, event_id, sort, fingerprint], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, is_ts: bool, sort: str, fingerprint: str) -> tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, event_id, issued_sort, issued_fingerprint = json.loads(base64.urlsafe_b64decode(padded))
+        if is_ts:
+            value = datetime.fromisoformat(value)
+        event_id = int(event_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if issued_sort != sort or issued_fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor was issued for a different sort or filter",
+        )
+    return value, event_id
+
+
+async def _estimated_row_count(db: AsyncSession) -> Optional[int]:
+    estimate = await db.scalar(
+        text(
+            "SELECT (CASE WHEN p.relkind = 'p' THEN ("
+            "SELECT SUM(c.reltuples) FILTER (WHERE c.reltuples >= 0) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = p.oid"
+            ") ELSE p.reltuples END)::bigint "
+            "FROM pg_class p WHERE p.oid = 'audit_events'::regclass"
+        )
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+async def _capped_count(db: AsyncSession, query, cap: int) -> tuple[int, bool]:
+    limited = query.with_only_columns(AuditEvent.id).order_by(None).limit(cap + 1).subquery()
+    count = await db.scalar(select(func.count()).select_from(limited)) or 0
+    if count > cap:
+        return cap, True
+    return count, False
+
 
 @router.get("", response_model=AuditPageResponse)
-def list_audit_events(
-    user=Depends(require_admin),
-    db: Session = Depends(get_db),
+async def list_audit_events(
+    user=Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     search: Optional[str] = Query(default=None),
     action: Optional[str] = Query(default=None),
     resource_type: Optional[str] = Query(default=None),
+    from_ts: Optional[datetime] = Query(default=None),
+    to_ts: Optional[datetime] = Query(default=None),
     sort: str = Query(default="ts_desc"),
+    cursor: Optional[str] = Query(default=None),
+    count: Optional[str] = Query(default=None),
 ) -> AuditPageResponse:
-    query = db.query(AuditEvent)
+    if count is None:
+        count = "none" if cursor is not None else "exact"
+    if count not in {"exact", "estimate", "none"}:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid count mode")
+    query = select(AuditEvent)
 
+    filtered = bool(action or resource_type or search or from_ts or to_ts)
+    if from_ts:
+        query = query.where(AuditEvent.ts >= from_ts)
+    if to_ts:
+        query = query.where(AuditEvent.ts < to_ts)
     if action:
-        query = query.filter(AuditEvent.action == action)
+        query = query.where(AuditEvent.action == action)
     if resource_type:
-        query = query.filter(AuditEvent.resource_type == resource_type)
+        query = query.where(AuditEvent.resource_type == resource_type)
     if search:
-        term = f"%{search.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(AuditEvent.action).ilike(term),
-                func.lower(AuditEvent.resource_type).ilike(term),
-                func.lower(AuditEvent.resource_id).ilike(term),
-                func.lower(cast(AuditEvent.actor_id, String)).ilike(term),
-                func.lower(cast(AuditEvent.ip, String)).ilike(term),
-                func.lower(cast(AuditEvent.metadata_json, String)).ilike(term),
-            )
-        )
+        query = query.where(_search_document().like(f"%{_escape_like(search.lower())}%", escape="\\"))
 
-    if sort == "ts_asc":
-        query = query.order_by(AuditEvent.ts.asc())
-    elif sort == "action_asc":
-        query = query.order_by(AuditEvent.action.asc())
-    elif sort == "action_desc":
-        query = query.order_by(AuditEvent.action.desc())
-    elif sort == "resource_asc":
-        query = query.order_by(AuditEvent.resource_type.asc())
-    elif sort == "resource_desc":
-        query = query.order_by(AuditEvent.resource_type.desc())
+    if sort not in SORT_KEYS:
+        sort = "ts_desc"
+    sort_column, descending = SORT_KEYS[sort]
+    fingerprint = _filter_fingerprint(search, action, resource_type, from_ts, to_ts)
+    if descending:
+        ordered = query.order_by(sort_column.desc(), AuditEvent.id.desc())
     else:
-        query = query.order_by(AuditEvent.ts.desc())
-
-    total = query.count()
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    page = min(page, total_pages)
-    events = (
-        query.offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+        ordered = query.order_by(sort_column.asc(), AuditEvent.id.asc())
+
+    total: Optional[int] = None
+    total_is_estimate = False
+    if count == "exact":
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    elif count == "estimate":
+        if not filtered:
+            total = await _estimated_row_count(db)
+        if total is None:
+            total, total_is_estimate = await _capped_count(db, query, settings.AUDIT_COUNT_CAP)
+        else:
+            total_is_estimate = True
+
+    next_cursor = None
+    if cursor is not None:
+        if cursor:
+            value, event_id = _decode_cursor(cursor, sort_column is AuditEvent.ts, sort, fingerprint)
+            key = tuple_(sort_column, AuditEvent.id)
+            ordered = ordered.where(key < (value, event_id) if descending else key > (value, event_id))
+        events = (await db.scalars(ordered.limit(page_size + 1))).all()
+        if len(events) > page_size:
+            events = events[:page_size]
+            last = events[-1]
+            next_cursor = _encode_cursor(getattr(last, sort_column.key), last.id, sort, fingerprint)
+        page = 1
+    else:
+        if total is not None:
+            page = min(page, max(1, (total + page_size - 1) // page_size))
+        events = (await db.scalars(ordered.offset((page - 1) * page_size).limit(page_size))).all()
 
     items = [
         AuditEventResponse(
@@ -78,10 +179,13 @@ def list_audit_events(
         for event in events
     ]
 
+    total_pages = max(1, (total + page_size - 1) // page_size) if total is not None else None
     return AuditPageResponse(
         items=items,
         page=page,
         page_size=page_size,
         total=total,
         total_pages=total_pages,
+        total_is_estimate=total_is_estimate,
+        next_cursor=next_cursor,
     )
@@ -2,14 +2,17 @@ from typing import Any
 
 import pyotp
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
-from app.core.audit import create_audit_event
+from app.core.audit import create_audit_event_async, record_audit_event
 from app.core.config import settings
-from app.core.deps import get_current_user, require_admin, require_admin_mfa
-from app.db import get_db
-from app.models import Role, User
+from app.core.deps import require_admin_async, require_admin_mfa_async
+from app.core.passwords import PasswordPoolSaturated, password_hasher
+from app.core.principals import get_user_role_names, notify_principal_changed
+from app.db import get_async_db
+from app.models import User
 from app.schemas import (
     LoginRequest,
     MfaEnableRequest,
@@ -22,9 +25,7 @@ from app.schemas import (
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-def _user_payload(db: Session, user: User) -> dict[str, Any]:
-    roles = db.query(Role.name).join(Role.users).filter(User.id == user.id).all()
-    role_names = [role.name for role in roles]
+def _user_payload(user: User, role_names: list[str]) -> dict[str, Any]:
     return {
         "id": user.id,
         "email": user.email,
@@ -34,23 +35,47 @@ def _user_payload(db: Session, user: User) -> dict[str, Any]:
     }
 
 
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _token_response(db: AsyncSession, user: User) -> TokenResponse:
+    role_names = await db.run_sync(get_user_role_names, user)
+    access_token = security.create_user_access_token(user.id, role_names, user.is_admin, user.role_version)
+    refresh_token = security.create_refresh_token(str(user.id))
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        user=_user_payload(user, role_names),
+    )
+
+
 @router.post("/register", response_model=TokenResponse)
-def register(payload: RegisterRequest, request: Request, db: Session = Depends(get_db)) -> TokenResponse:
-    existing = db.query(User).filter(User.email == payload.email).first()
+async def register(
+    payload: RegisterRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> TokenResponse:
+    existing = await db.scalar(select(User).where(User.email == payload.email))
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     is_admin = payload.is_admin if settings.ALLOW_ADMIN_REGISTRATION else False
+    try:
+        password_hash = await password_hasher.hash_async(payload.password)
+    except PasswordPoolSaturated:
+        raise _password_pool_busy()
     user = User(
         email=payload.email,
-        password_hash=security.get_password_hash(payload.password),
+        password_hash=password_hash,
         is_admin=is_admin,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
-    access_token = security.create_access_token(str(user.id))
-    refresh_token = security.create_refresh_token(str(user.id))
-    create_audit_event(
+    await db.flush()
+    record_audit_event(
         db,
         actor_id=user.id,
         action="register",
@@ -58,21 +83,27 @@ def register(payload: RegisterRequest, request: Request, db: Session = Depends(g
         resource_id=user.id,
         ip=request.client.host if request.client else None,
     )
-    return TokenResponse(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        user=_user_payload(db, user),
-    )
+    await db.commit()
+    await db.refresh(user)
+    return await _token_response(db, user)
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)) -> TokenResponse:
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not security.verify_password(payload.password, user.password_hash):
+async def login(payload: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)) -> TokenResponse:
+    user = await db.scalar(select(User).where(User.email == payload.email))
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    access_token = security.create_access_token(str(user.id))
-    refresh_token = security.create_refresh_token(str(user.id))
-    create_audit_event(
+    try:
+        verified, new_hash = await password_hasher.verify_async(payload.password, user.password_hash)
+    except PasswordPoolSaturated:
+        raise _password_pool_busy()
+    if not verified:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        user.password_hash = new_hash
+        db.add(user)
+        await db.commit()
+    await create_audit_event_async(
         db,
         actor_id=user.id,
         action="login",
@@ -80,37 +111,27 @@ def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)
         resource_id=user.id,
         ip=request.client.host if request.client else None,
     )
-    return TokenResponse(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        user=_user_payload(db, user),
-    )
+    return await _token_response(db, user)
 
 
 @router.post("/refresh", response_model=TokenResponse)
-def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> TokenResponse:
+async def refresh(payload: RefreshRequest, db: AsyncSession = Depends(get_async_db)) -> TokenResponse:
     try:
         claims = security.decode_refresh_token(payload.refresh_token)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
     if claims.get("type") != "refresh":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
-    user = db.query(User).filter(User.id == int(claims.get("sub", 0))).first()
+    user = await db.get(User, int(claims.get("sub", 0)))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    access_token = security.create_access_token(str(user.id))
-    refresh_token = security.create_refresh_token(str(user.id))
-    return TokenResponse(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        user=_user_payload(db, user),
-    )
+    return await _token_response(db, user)
 
 
 @router.post("/mfa/setup", response_model=MfaSetupResponse)
-def mfa_setup(
-    user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+async def mfa_setup(
+    user: User = Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> MfaSetupResponse:
     if user.mfa_enabled:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="MFA already enabled")
@@ -118,17 +139,18 @@ def mfa_setup(
     user.mfa_secret = secret
     user.mfa_enabled = False
     db.add(user)
-    db.commit()
+    await db.run_sync(notify_principal_changed, user.id)
+    await db.commit()
     totp = pyotp.TOTP(secret)
     otpauth_url = totp.provisioning_uri(name=user.email, issuer_name="PAM Demo")
     return MfaSetupResponse(secret=secret, otpauth_url=otpauth_url)
 
 
 @router.post("/mfa/enable")
-def mfa_enable(
+async def mfa_enable(
     payload: MfaEnableRequest,
-    user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    user: User = Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None,
 ) -> dict:
     if user.mfa_enabled:
@@ -140,8 +162,8 @@ def mfa_enable(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid MFA code")
     user.mfa_enabled = True
     db.add(user)
-    db.commit()
-    create_audit_event(
+    await db.run_sync(notify_principal_changed, user.id)
+    record_audit_event(
         db,
         actor_id=user.id,
         action="mfa_enable",
@@ -149,20 +171,21 @@ def mfa_enable(
         resource_id=user.id,
         ip=request.client.host if request and request.client else None,
     )
+    await db.commit()
     return {"status": "enabled"}
 
 
 @router.post("/mfa/disable")
-def mfa_disable(
-    user: User = Depends(require_admin_mfa),
-    db: Session = Depends(get_db),
+async def mfa_disable(
+    user: User = Depends(require_admin_mfa_async),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None,
 ) -> dict:
     user.mfa_enabled = False
     user.mfa_secret = None
     db.add(user)
-    db.commit()
-    create_audit_event(
+    await db.run_sync(notify_principal_changed, user.id)
+    record_audit_event(
         db,
         actor_id=user.id,
         action="mfa_disable",
@@ -170,4 +193,5 @@ def mfa_disable(
         resource_id=user.id,
         ip=request.client.host if request and request.client else None,
     )
+    await db.commit()
     return {"status": "disabled"}
@@ -1,23 +1,32 @@
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.audit import create_audit_event
-from app.core.deps import require_admin_mfa, require_auth
-from app.db import get_db
+from app.core.audit import record_audit_event
+from app.core.deps import require_admin_mfa_async, require_auth_async
+from app.db import get_async_db
 from app.models import JitRequest, User
 from app.schemas import JitRequestCreate, JitRequestResponse
+from app.ws import jit_topics, manager
 
 router = APIRouter(prefix="/jit-requests", tags=["jit"])
 
 
+async def _publish_jit(jit: JitRequest, event: str) -> None:
+    await manager.broadcast(
+        {"type": event, "jit_request_id": jit.id, "status": jit.status},
+        jit_topics(jit.asset_id, jit.user_id),
+    )
+
+
 @router.post("", response_model=JitRequestResponse)
-def create_jit_request(
+async def create_jit_request(
     payload: JitRequestCreate,
     request: Request,
-    user: User = Depends(require_auth),
-    db: Session = Depends(get_db),
+    user: User = Depends(require_auth_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> JitRequestResponse:
     status_value = "PENDING"
     approved_by = None
@@ -37,9 +46,8 @@ def create_jit_request(
         expires_at=expires_at,
     )
     db.add(jit)
-    db.commit()
-    db.refresh(jit)
-    create_audit_event(
+    await db.flush()
+    record_audit_event(
         db,
         actor_id=user.id,
         action="jit_request",
@@ -48,7 +56,7 @@ def create_jit_request(
         ip=request.client.host if request.client else None,
     )
     if user.is_admin and jit.status == "APPROVED":
-        create_audit_event(
+        record_audit_event(
             db,
             actor_id=user.id,
             action="jit_auto_approve",
@@ -56,6 +64,9 @@ def create_jit_request(
             resource_id=jit.id,
             ip=request.client.host if request.client else None,
         )
+    await db.commit()
+    await db.refresh(jit)
+    await _publish_jit(jit, "jit_requested")
     return JitRequestResponse(
         id=jit.id,
         user_id=jit.user_id,
@@ -71,11 +82,14 @@ def create_jit_request(
 
 
 @router.get("", response_model=list[JitRequestResponse])
-def list_jit_requests(user: User = Depends(require_auth), db: Session = Depends(get_db)) -> list[JitRequestResponse]:
-    query = db.query(JitRequest)
+async def list_jit_requests(
+    user: User = Depends(require_auth_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[JitRequestResponse]:
+    query = select(JitRequest)
     if not user.is_admin:
-        query = query.filter(JitRequest.user_id == user.id)
-    jit_requests = query.order_by(JitRequest.created_at.desc()).all()
+        query = query.where(JitRequest.user_id == user.id)
+    jit_requests = (await db.scalars(query.order_by(JitRequest.created_at.desc()))).all()
     return [
         JitRequestResponse(
             id=jit.id,
@@ -94,13 +108,13 @@ def list_jit_requests(user: User = Depends(require_auth), db: Session = Depends(
 
 
 @router.post("/{jit_id}/approve", response_model=JitRequestResponse)
-def approve_jit_request(
+async def approve_jit_request(
     jit_id: int,
     request: Request,
-    user: User = Depends(require_admin_mfa),
-    db: Session = Depends(get_db),
+    user: User = Depends(require_admin_mfa_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> JitRequestResponse:
-    jit = db.query(JitRequest).filter(JitRequest.id == jit_id).first()
+    jit = await db.get(JitRequest, jit_id)
     if not jit:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="JIT request not found")
     if jit.status != "PENDING":
@@ -109,8 +123,7 @@ def approve_jit_request(
     jit.approved_by = user.id
     jit.expires_at = datetime.utcnow() + timedelta(minutes=jit.duration_minutes)
     db.add(jit)
-    db.commit()
-    create_audit_event(
+    record_audit_event(
         db,
         actor_id=user.id,
         action="jit_approve",
@@ -118,6 +131,8 @@ def approve_jit_request(
         resource_id=jit.id,
         ip=request.client.host if request.client else None,
     )
+    await db.commit()
+    await _publish_jit(jit, "jit_updated")
     return JitRequestResponse(
         id=jit.id,
         user_id=jit.user_id,
@@ -133,13 +148,13 @@ def approve_jit_request(
 
 
 @router.post("/{jit_id}/deny", response_model=JitRequestResponse)
-def deny_jit_request(
+async def deny_jit_request(
     jit_id: int,
     request: Request,
-    user: User = Depends(require_admin_mfa),
-    db: Session = Depends(get_db),
+    user: User = Depends(require_admin_mfa_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> JitRequestResponse:
-    jit = db.query(JitRequest).filter(JitRequest.id == jit_id).first()
+    jit = await db.get(JitRequest, jit_id)
     if not jit:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="JIT request not found")
     if jit.status != "PENDING":
@@ -147,8 +162,7 @@ def deny_jit_request(
     jit.status = "DENIED"
     jit.approved_by = user.id
     db.add(jit)
-    db.commit()
-    create_audit_event(
+    record_audit_event(
         db,
         actor_id=user.id,
         action="jit_deny",
@@ -156,6 +170,8 @@ def deny_jit_request(
         resource_id=jit.id,
         ip=request.client.host if request.client else None,
     )
+    await db.commit()
+    await _publish_jit(jit, "jit_updated")
     return JitRequestResponse(
         id=jit.id,
         user_id=jit.user_id,
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.audit import audit_buffer
+from app.core.deps import require_admin
+from app.core.passwords import password_hasher
+from app.core.principals import principal_cache
+from app.core.scheduler import cluster_job_runs, scheduler
+from app.db import get_db, pool_stats, server_connection_stats
+from app.ws import manager
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+def get_metrics(user=Depends(require_admin), db: Session = Depends(get_db)) -> dict:
+    return {
+        "password_hasher": password_hasher.stats(),
+        "audit_buffer": {
+            "queue_depth": audit_buffer.queue_depth(),
+            "flushed": audit_buffer.flushed_events,
+            "overflow": audit_buffer.overflow_events,
+            "failed": audit_buffer.failed_events,
+        },
+        "principal_cache": {
+            "hits": principal_cache.hits,
+            "misses": principal_cache.misses,
+        },
+        "updates": manager.stats(),
+        "scheduler": {**scheduler.stats(), "cluster": cluster_job_runs(db)},
+        "database": {**pool_stats(), "server": server_connection_stats(db)},
+    }
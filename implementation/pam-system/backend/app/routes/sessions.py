@@ -1,103 +1,181 @@
-import json
+import base64
 import os
-from collections import deque
+import struct
+import zlib
 from datetime import datetime
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, status
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import String, cast, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.audit import create_audit_event
+from app.core.audit import record_audit_event
 from app.core.config import settings
-from app.core.deps import require_auth
+from app.core.deps import (
+    current_role_names_async,
+    get_access_claims,
+    is_admin_principal,
+    require_auth,
+    require_auth_async,
+)
 from app.core.security import create_gateway_token
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.models import Asset, Credential, JitRequest, Role, Session as SessionModel, User
-from app.schemas import CommandLogEntry, SessionResponse, SessionStartRequest
-from app.ws import manager
+from app.recordings import (
+    binary_recording_path,
+    command_log_path,
+    iter_file_range,
+    iter_gzip,
+    iter_json_lines,
+    iter_log_records,
+    iter_records,
+    parse_byte_range,
+    read_binary_chunks,
+    read_command_after,
+    read_command_tail,
+    read_log_chunks,
+)
+from app.schemas import (
+    CommandLogEntry,
+    RecordingChunk,
+    RecordingChunkPage,
+    SessionEndBatch,
+    SessionResponse,
+    SessionStartRequest,
+)
+from app.ws import manager, session_topics
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
 
-def _user_role_names(db: Session, user: User) -> set[str]:
-    roles = db.query(Role.name).join(Role.users).filter(User.id == user.id).all()
-    return {role.name for role in roles}
+def get_visible_session(db: Session, user: User, session_id: int) -> SessionModel:
+    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    if not user.is_admin:
+        jit = db.query(JitRequest).filter(JitRequest.id == session.jit_request_id).first()
+        if not jit or jit.user_id != user.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return session
+
+
+def _recording_files(session: SessionModel) -> tuple[str, str]:
+    if not session.recording_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording not available")
+    file_path = os.path.join("/data", session.recording_path)
+    rec_path = binary_recording_path(file_path)
+    if not os.path.exists(file_path) and not os.path.exists(rec_path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording file missing")
+    return file_path, rec_path
 
 
 @router.post("/start")
 async def start_session(
     payload: SessionStartRequest,
     request: Request,
-    user: User = Depends(require_auth),
-    db: Session = Depends(get_db),
+    user: User = Depends(require_auth_async),
+    claims: Dict[str, Any] = Depends(get_access_claims),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
-    jit = db.query(JitRequest).filter(JitRequest.id == payload.jit_request_id).first()
-    if not jit:
+    row = (
+        await db.execute(
+            select(
+                JitRequest,
+                Role.name.label("role_name"),
+                Asset.host,
+                Asset.port,
+                Credential.id.label("credential_id"),
+                Credential.vault_path,
+            )
+            .outerjoin(Role, Role.id == JitRequest.role_id)
+            .outerjoin(Asset, Asset.id == JitRequest.asset_id)
+            .outerjoin(Credential, Credential.asset_id == JitRequest.asset_id)
+            .where(JitRequest.id == payload.jit_request_id)
+        )
+    ).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="JIT request not found")
+    jit = row.JitRequest
     if jit.status != "APPROVED":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="JIT request not approved")
     if jit.expires_at and jit.expires_at < datetime.utcnow():
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="JIT request expired")
-    if not user.is_admin and jit.user_id != user.id:
+    is_admin = is_admin_principal(user, claims)
+    if not is_admin and jit.user_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not your JIT request")
-    role = db.query(Role).filter(Role.id == jit.role_id).first()
-    if role and role.name not in _user_role_names(db, user) and not user.is_admin:
+    if row.role_name is not None and not is_admin and row.role_name not in await current_role_names_async(db, user, claims):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing required role")
-    asset = db.query(Asset).filter(Asset.id == jit.asset_id).first()
-    credential = db.query(Credential).filter(Credential.asset_id == jit.asset_id).first()
-    if not asset or not credential:
+    if row.host is None or row.credential_id is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Asset or credential missing")
-    session = SessionModel(
-        jit_request_id=jit.id,
-        status="ACTIVE",
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    session.recording_path = f"recordings/session-{session.id}.log"
-    db.add(session)
-    db.commit()
 
-    token_payload = {
-        "session_id": session.id,
-        "recording_path": session.recording_path,
-        "vault_path": credential.vault_path,
-        "asset_host": asset.host,
-        "asset_port": asset.port,
-        "user_id": user.id,
-    }
-    session_token = create_gateway_token(token_payload)
-    create_audit_event(
+    sessions_table = SessionModel.__table__
+    next_id = select(func.nextval(func.pg_get_serial_sequence("sessions", "id")).label("id")).cte("next_session")
+    insert_session = (
+        insert(sessions_table)
+        .from_select(
+            ["id", "jit_request_id", "status", "started_at", "recording_path"],
+            select(
+                next_id.c.id,
+                literal(jit.id),
+                literal("ACTIVE"),
+                literal(datetime.utcnow()),
+                literal("recordings/session-") + cast(next_id.c.id, String) + literal(".log"),
+            ),
+        )
+        .returning(sessions_table.c.id, sessions_table.c.recording_path)
+    )
+    session_id, recording_path = (await db.execute(insert_session)).one()
+    client_ip = request.client.host if request.client else None
+    record_audit_event(
         db,
         actor_id=user.id,
         action="session_start",
         resource_type="session",
-        resource_id=session.id,
-        ip=request.client.host if request.client else None,
+        resource_id=session_id,
+        ip=client_ip,
     )
-    create_audit_event(
+    record_audit_event(
         db,
         actor_id=user.id,
         action="vault_access",
         resource_type="credential",
-        resource_id=credential.id,
-        ip=request.client.host if request.client else None,
-        metadata={"vault_path": credential.vault_path},
+        resource_id=row.credential_id,
+        ip=client_ip,
+        metadata={"vault_path": row.vault_path},
+    )
+    await db.commit()
+
+    token_payload = {
+        "session_id": session_id,
+        "recording_path": recording_path,
+        "vault_path": row.vault_path,
+        "asset_host": row.host,
+        "asset_port": row.port,
+        "user_id": user.id,
+    }
+    session_token = create_gateway_token(token_payload)
+    await manager.broadcast(
+        {"type": "session_started", "session_id": session_id},
+        session_topics(session_id, jit.asset_id, jit.user_id),
     )
-    await manager.broadcast({"type": "session_started", "session_id": session.id})
     return {
-        "session_id": session.id,
+        "session_id": session_id,
         "session_token": session_token,
         "websocket_url": settings.GATEWAY_PUBLIC_WS_URL,
     }
 
 
 @router.get("", response_model=list[SessionResponse])
-def list_sessions(user: User = Depends(require_auth), db: Session = Depends(get_db)) -> list[SessionResponse]:
-    query = db.query(SessionModel)
+async def list_sessions(
+    user: User = Depends(require_auth_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[SessionResponse]:
+    query = select(SessionModel)
     if not user.is_admin:
-        query = query.join(JitRequest).filter(JitRequest.user_id == user.id)
-    sessions = query.order_by(SessionModel.started_at.desc()).all()
+        query = query.join(JitRequest).where(JitRequest.user_id == user.id)
+    sessions = (await db.scalars(query.order_by(SessionModel.started_at.desc()))).all()
     return [
         SessionResponse(
             id=session.id,
@@ -114,22 +192,91 @@ def list_sessions(user: User = Depends(require_auth), db: Session = Depends(get_
 @router.get("/{session_id}/recording")
 def get_recording(
     session_id: int,
+    request: Request,
     user: User = Depends(require_auth),
     db: Session = Depends(get_db),
 ) -> Response:
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    if not user.is_admin:
-        jit = db.query(JitRequest).filter(JitRequest.id == session.jit_request_id).first()
-        if not jit or jit.user_id != user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    if not session.recording_path:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording not available")
-    file_path = os.path.join("/data", session.recording_path)
+    session = get_visible_session(db, user, session_id)
+    file_path, rec_path = _recording_files(session)
+    gzip_accepted = "gzip" in request.headers.get("accept-encoding", "").lower()
+    gzip_headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
     if not os.path.exists(file_path):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording file missing")
-    return FileResponse(file_path, media_type="text/plain")
+        lines = iter_json_lines(iter_records(rec_path))
+        if gzip_accepted:
+            return StreamingResponse(iter_gzip(lines), media_type="text/plain", headers=gzip_headers)
+        return StreamingResponse(lines, media_type="text/plain")
+    file_size = os.path.getsize(file_path)
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = parse_byte_range(range_header, file_size)
+        if byte_range is None:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Invalid range",
+                headers={"Content-Range": f"bytes */{file_size}"},
+            )
+        start, end = byte_range
+        return StreamingResponse(
+            iter_file_range(file_path, start, end),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type="text/plain",
+            headers={
+                "Accept-Ranges": "bytes",
+                "Content-Range": f"bytes {start}-{end}/{file_size}",
+                "Content-Length": str(end - start + 1),
+            },
+        )
+    if gzip_accepted:
+        return StreamingResponse(
+            iter_gzip(iter_file_range(file_path, 0, file_size - 1)),
+            media_type="text/plain",
+            headers={**gzip_headers, "Accept-Ranges": "bytes"},
+        )
+    return FileResponse(file_path, media_type="text/plain", headers={"Accept-Ranges": "bytes"})
+
+
+@router.get("/{session_id}/recording/chunks", response_model=RecordingChunkPage)
+def get_recording_chunks(
+    session_id: int,
+    user: User = Depends(require_auth),
+    db: Session = Depends(get_db),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+) -> RecordingChunkPage:
+    session = get_visible_session(db, user, session_id)
+    file_path, rec_path = _recording_files(session)
+    if os.path.exists(file_path):
+        records, next_offset, eof = read_log_chunks(file_path, offset, limit)
+    else:
+        try:
+            records, next_offset, eof = read_binary_chunks(rec_path, offset, limit)
+        except (ValueError, struct.error, zlib.error):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid recording offset")
+    return RecordingChunkPage(
+        items=[
+            RecordingChunk(ts=ts, data=base64.b64encode(data).decode("ascii"))
+            for ts, data in records
+        ],
+        next_offset=next_offset,
+        eof=eof,
+    )
+
+
+@router.get("/{session_id}/recording/range")
+def get_recording_range(
+    session_id: int,
+    user: User = Depends(require_auth),
+    db: Session = Depends(get_db),
+    from_ts: Optional[float] = Query(default=None),
+    to_ts: Optional[float] = Query(default=None),
+) -> Response:
+    session = get_visible_session(db, user, session_id)
+    file_path, rec_path = _recording_files(session)
+    if os.path.exists(rec_path):
+        records = iter_records(rec_path, from_ts=from_ts, to_ts=to_ts)
+    else:
+        records = iter_log_records(file_path, from_ts=from_ts, to_ts=to_ts)
+    return StreamingResponse(iter_json_lines(records), media_type="text/plain")
 
 
 @router.get("/{session_id}/commands", response_model=list[CommandLogEntry])
@@ -138,54 +285,51 @@ def get_command_log(
     user: User = Depends(require_auth),
     db: Session = Depends(get_db),
     limit: int = Query(200, ge=1, le=1000),
+    before_offset: Optional[int] = Query(default=None, ge=0),
+    after_offset: Optional[int] = Query(default=None, ge=0),
 ) -> list[CommandLogEntry]:
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    if not user.is_admin:
-        jit = db.query(JitRequest).filter(JitRequest.id == session.jit_request_id).first()
-        if not jit or jit.user_id != user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    recording_name = os.path.basename(session.recording_path or "")
-    if recording_name.endswith(".log"):
-        base_name = recording_name[:-4]
-    else:
-        base_name = f"session-{session.id}"
-    cmd_path = os.path.join("/data/recordings", f"{base_name}.cmd.log")
+    session = get_visible_session(db, user, session_id)
+    cmd_path = command_log_path(session.recording_path, session.id)
     if not os.path.exists(cmd_path):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Command log not available")
-    entries = deque(maxlen=limit)
-    with open(cmd_path, "r", encoding="utf-8") as handle:
-        for line in handle:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                payload = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if "ts" in payload and "line" in payload:
-                entries.append(CommandLogEntry(ts=payload["ts"], line=payload["line"]))
-    return list(entries)
+    if before_offset is not None and after_offset is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either before_offset or after_offset",
+        )
+    if after_offset is not None:
+        entries = read_command_after(cmd_path, after_offset, limit)
+    else:
+        entries = read_command_tail(cmd_path, limit, before_offset=before_offset)
+    return [
+        CommandLogEntry(ts=payload["ts"], line=payload["line"], offset=offset)
+        for offset, payload in entries
+    ]
 
 
 @router.post("/{session_id}/end")
 async def end_session(
     session_id: int,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     x_gateway_api_key: str | None = Header(default=None, alias="X-Gateway-Api-Key"),
 ) -> dict:
     if x_gateway_api_key != settings.GATEWAY_API_KEY:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not session:
+    row = (
+        await db.execute(
+            select(SessionModel, JitRequest.asset_id, JitRequest.user_id)
+            .join(JitRequest, JitRequest.id == SessionModel.jit_request_id)
+            .where(SessionModel.id == session_id)
+        )
+    ).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    session = row.Session
     session.status = "ENDED"
     session.ended_at = datetime.utcnow()
     db.add(session)
-    db.commit()
-    create_audit_event(
+    record_audit_event(
         db,
         actor_id=None,
         action="session_end",
@@ -193,5 +337,53 @@ async def end_session(
         resource_id=session.id,
         ip=request.client.host if request.client else None,
     )
-    await manager.broadcast({"type": "session_ended", "session_id": session.id})
+    await db.commit()
+    await manager.broadcast(
+        {"type": "session_ended", "session_id": session.id},
+        session_topics(session.id, row.asset_id, row.user_id),
+    )
     return {"status": "ended"}
+
+
+@router.post("/end")
+async def end_sessions(
+    payload: SessionEndBatch,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    x_gateway_api_key: str | None = Header(default=None, alias="X-Gateway-Api-Key"),
+) -> dict:
+    if x_gateway_api_key != settings.GATEWAY_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    items = {item.session_id: item for item in payload.items}
+    if not items:
+        return {"ended": []}
+    rows = (
+        await db.execute(
+            select(SessionModel, JitRequest.asset_id, JitRequest.user_id)
+            .join(JitRequest, JitRequest.id == SessionModel.jit_request_id)
+            .where(SessionModel.id.in_(items))
+            .where(SessionModel.status != "ENDED")
+        )
+    ).all()
+    client_ip = request.client.host if request.client else None
+    now = datetime.utcnow()
+    for row in rows:
+        session = row.Session
+        ended_at = items[session.id].ended_at
+        session.status = "ENDED"
+        session.ended_at = datetime.utcfromtimestamp(ended_at) if ended_at else now
+        record_audit_event(
+            db,
+            actor_id=None,
+            action="session_end",
+            resource_type="session",
+            resource_id=session.id,
+            ip=client_ip,
+        )
+    await db.commit()
+    for row in rows:
+        await manager.broadcast(
+            {"type": "session_ended", "session_id": row.Session.id},
+            session_topics(row.Session.id, row.asset_id, row.user_id),
+        )
+    return {"ended": [row.Session.id for row in rows]}
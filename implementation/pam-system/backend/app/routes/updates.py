@@ -1,17 +1,179 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.ws import manager
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+
+from app.core.deps import authenticate_claims, authenticate_token, decode_access_claims, is_admin_principal
+from app.core.principals import load_principal, principal_cache
+from app.db import SessionLocal
+from app.live import live_hub
+from app.models import Session as SessionModel, User
+from app.recordings import command_log_path
+from app.routes.sessions import get_visible_session
+from app.ws import JIT_TOPIC, SESSIONS_TOPIC, manager
 
 router = APIRouter()
 
+MAX_TOPICS_PER_MESSAGE = 100
+
+
+def _authorize_topics(user: User, is_admin: bool, topics: List[str]) -> Tuple[List[str], List[str]]:
+    accepted: List[str] = []
+    rejected: List[str] = []
+    db = None
+    try:
+        for topic in topics[:MAX_TOPICS_PER_MESSAGE]:
+            kind, _, ident = str(topic).partition(":")
+            if kind in (JIT_TOPIC, SESSIONS_TOPIC) and not ident:
+                allowed = is_admin
+            elif kind in ("session", "asset", "user") and ident.isdigit():
+                if is_admin:
+                    allowed = True
+                elif kind == "user":
+                    allowed = int(ident) == user.id
+                elif kind == "session":
+                    db = db or SessionLocal()
+                    try:
+                        get_visible_session(db, user, int(ident))
+                        allowed = True
+                    except HTTPException:
+                        allowed = False
+                else:
+                    allowed = False
+            else:
+                allowed = False
+            (accepted if allowed else rejected).append(topic)
+    finally:
+        if db is not None:
+            db.close()
+    return accepted, rejected
+
+
+def _default_topics(user: User, is_admin: bool) -> List[str]:
+    if is_admin:
+        return [SESSIONS_TOPIC, JIT_TOPIC]
+    return [f"user:{user.id}"]
+
+
+def _claims_still_current(claims: Dict[str, Any]) -> bool:
+    db = SessionLocal()
+    try:
+        user = load_principal(db, int(claims["sub"]))
+        return user is not None and user.role_version == claims.get("rv")
+    finally:
+        db.close()
+
+
+async def _close_when_stale(websocket: WebSocket, claims: Dict[str, Any], changed: asyncio.Event) -> None:
+    while True:
+        remaining = float(claims.get("exp", 0)) - time.time()
+        if remaining <= 0:
+            break
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=remaining)
+        except asyncio.TimeoutError:
+            break
+        changed.clear()
+        if not await asyncio.to_thread(_claims_still_current, claims):
+            break
+    manager.disconnect(websocket)
+    try:
+        await websocket.close(code=1008)
+    except RuntimeError:
+        pass
+
+
+def _authenticate_socket(token: str) -> Tuple[Dict[str, Any], User]:
+    db = SessionLocal()
+    try:
+        claims = decode_access_claims(token)
+        return claims, authenticate_claims(db, claims)
+    finally:
+        db.close()
+
+
+def _visible_session(token: str, session_id: int) -> SessionModel:
+    db = SessionLocal()
+    try:
+        return get_visible_session(db, authenticate_token(db, token), session_id)
+    finally:
+        db.close()
+
 
 @router.websocket("/ws/updates")
 async def updates_socket(websocket: WebSocket) -> None:
-    await manager.connect(websocket)
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=1008)
+        return
+    try:
+        claims, user = await asyncio.to_thread(_authenticate_socket, token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    is_admin = is_admin_principal(user, claims)
+    requested = [topic for topic in websocket.query_params.get("topics", "").split(",") if topic]
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def on_principal_changed(user_id: Optional[int]) -> None:
+        if user_id is None or user_id == user.id:
+            loop.call_soon_threadsafe(changed.set)
+
+    principal_cache.watch(on_principal_changed)
+    client = await manager.connect(websocket)
+    guard = asyncio.create_task(_close_when_stale(websocket, claims, changed))
+    accepted, _ = await asyncio.to_thread(
+        _authorize_topics, user, is_admin, requested or _default_topics(user, is_admin)
+    )
+    manager.subscribe(client, accepted)
     try:
         while True:
-            await websocket.receive()
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
-    except RuntimeError:
+            message: Dict[str, Any] = await websocket.receive_json()
+            action = message.get("action") if isinstance(message, dict) else None
+            topics = message.get("topics") if isinstance(message, dict) else None
+            if action not in ("subscribe", "unsubscribe") or not isinstance(topics, list):
+                client.offer({"type": "error", "detail": "Expected subscribe or unsubscribe with a topics list"})
+                continue
+            if action == "unsubscribe":
+                topics = [topic for topic in topics if isinstance(topic, str)]
+                manager.unsubscribe(client, topics)
+                client.offer({"type": "unsubscribed", "topics": topics})
+                continue
+            accepted, rejected = await asyncio.to_thread(_authorize_topics, user, is_admin, topics)
+            manager.subscribe(client, accepted)
+            client.offer({"type": "subscribed", "topics": accepted, "rejected": rejected})
+    except (WebSocketDisconnect, RuntimeError, ValueError):
+        pass
+    finally:
+        guard.cancel()
+        principal_cache.unwatch(on_principal_changed)
         manager.disconnect(websocket)
+
+
+@router.websocket("/ws/sessions/{session_id}")
+async def session_live_socket(websocket: WebSocket, session_id: int) -> None:
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=1008)
+        return
+    try:
+        session = await asyncio.to_thread(_visible_session, token, session_id)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    if not session.recording_path:
+        await websocket.close(code=1011)
+        return
+    await websocket.accept()
+    recording_file = os.path.join("/data", session.recording_path)
+    live_hub.subscribe(websocket, session.id, recording_file, command_log_path(session.recording_path, session.id))
+    try:
+        while True:
+            await websocket.receive()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        live_hub.unsubscribe(websocket, session.id)
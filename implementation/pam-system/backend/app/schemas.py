@@ -56,6 +56,26 @@ class CredentialCreate(BaseModel):
     password: str
 
 
+class BulkCredentialItem(BaseModel):
+    asset_id: int
+    username: str
+    password: str
+
+
+class BulkCredentialImport(BaseModel):
+    items: List[BulkCredentialItem]
+
+
+class BulkCredentialFailure(BaseModel):
+    asset_id: int
+    detail: str
+
+
+class BulkCredentialImportResponse(BaseModel):
+    imported: List[int]
+    failed: List[BulkCredentialFailure]
+
+
 class RoleResponse(BaseModel):
     id: int
     name: str
@@ -85,6 +105,15 @@ class SessionStartRequest(BaseModel):
     jit_request_id: int
 
 
+class SessionEndItem(BaseModel):
+    session_id: int
+    ended_at: Optional[float] = None
+
+
+class SessionEndBatch(BaseModel):
+    items: List[SessionEndItem]
+
+
 class SessionResponse(BaseModel):
     id: int
     jit_request_id: int
@@ -108,14 +137,28 @@ class AuditEventResponse(BaseModel):
 class CommandLogEntry(BaseModel):
     ts: float
     line: str
+    offset: Optional[int] = None
+
+
+class RecordingChunk(BaseModel):
+    ts: float
+    data: str
+
+
+class RecordingChunkPage(BaseModel):
+    items: List[RecordingChunk]
+    next_offset: int
+    eof: bool
 
 
 class AuditPageResponse(BaseModel):
     items: List[AuditEventResponse]
     page: int
     page_size: int
-    total: int
-    total_pages: int
+    total: Optional[int]
+    total_pages: Optional[int]
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class RoleListResponse(BaseModel):
@@ -1,28 +1,118 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from app.core.config import settings
 
 
-def _headers() -> dict:
-    return {"X-Vault-Token": settings.VAULT_TOKEN}
+class VaultClient:
+    def __init__(
+        self,
+        addr: str,
+        token: str,
+        mount: str,
+        pool_size: int,
+        retries: int,
+        backoff: float,
+        timeout: float,
+    ) -> None:
+        self.addr = addr.rstrip("/")
+        self.token = token
+        self.mount = mount
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+        self._mount_ready = False
 
+    def _http(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.pool_size,
+                    max_retries=self._retry,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["X-Vault-Token"] = self.token
+                self._session = session
+            return self._session
 
-def ensure_kv_v2_mount() -> None:
-    url = f"{settings.VAULT_ADDR}/v1/sys/mounts/{settings.VAULT_KV_MOUNT}"
-    payload = {"type": "kv", "options": {"version": "2"}}
-    response = requests.post(url, headers=_headers(), json=payload, timeout=5)
-    if response.status_code not in (200, 204, 400):
+    def ensure_kv_v2_mount(self) -> None:
+        if self._mount_ready:
+            return
+        url = f"{self.addr}/v1/sys/mounts/{self.mount}"
+        payload = {"type": "kv", "options": {"version": "2"}}
+        response = self._http().post(url, json=payload, timeout=self.timeout)
+        if response.status_code not in (200, 204, 400):
+            response.raise_for_status()
+        self._mount_ready = True
+
+    def write_kv2(self, path: str, data: dict) -> None:
+        self.ensure_kv_v2_mount()
+        url = f"{self.addr}/v1/{self.mount}/data/{path}"
+        response = self._http().post(url, json={"data": data}, timeout=self.timeout)
         response.raise_for_status()
 
+    def read_kv2(self, path: str) -> dict:
+        url = f"{self.addr}/v1/{self.mount}/data/{path}"
+        response = self._http().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["data"]["data"]
+
+    def write_many_kv2(self, items: List[Tuple[str, dict]], concurrency: int) -> Dict[str, Optional[str]]:
+        self.ensure_kv_v2_mount()
+
+        def _write(item: Tuple[str, dict]) -> Tuple[str, Optional[str]]:
+            path, data = item
+            try:
+                self.write_kv2(path, data)
+            except Exception as exc:
+                return path, str(exc)
+            return path, None
+
+        workers = max(1, min(concurrency, self.pool_size, len(items)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vault-write") as executor:
+            return dict(executor.map(_write, items))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+vault_client = VaultClient(
+    addr=settings.VAULT_ADDR,
+    token=settings.VAULT_TOKEN,
+    mount=settings.VAULT_KV_MOUNT,
+    pool_size=settings.VAULT_POOL_SIZE,
+    retries=settings.VAULT_RETRIES,
+    backoff=settings.VAULT_RETRY_BACKOFF_MS / 1000,
+    timeout=settings.VAULT_TIMEOUT_SECONDS,
+)
+
+
+def ensure_kv_v2_mount() -> None:
+    vault_client.ensure_kv_v2_mount()
+
 
 def write_kv2(path: str, data: dict) -> None:
-    url = f"{settings.VAULT_ADDR}/v1/{settings.VAULT_KV_MOUNT}/data/{path}"
-    response = requests.post(url, headers=_headers(), json={"data": data}, timeout=5)
-    response.raise_for_status()
+    vault_client.write_kv2(path, data)
 
 
 def read_kv2(path: str) -> dict:
-    url = f"{settings.VAULT_ADDR}/v1/{settings.VAULT_KV_MOUNT}/data/{path}"
-    response = requests.get(url, headers=_headers(), timeout=5)
-    response.raise_for_status()
-    return response.json()["data"]["data"]
+    return vault_client.read_kv2(path)
@@ -1,25 +1,276 @@
-from typing import Any, Set
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
 
 from fastapi import WebSocket
+from sqlalchemy import text
 
+from app.core.config import settings
+from app.db import async_engine, engine
 
-class ConnectionManager:
+MessageHandler = Callable[[dict[str, Any]], None]
+
+UPDATES_CHANNEL = "pam_updates"
+JIT_TOPIC = "jit"
+SESSIONS_TOPIC = "sessions"
+
+
+def session_topics(session_id: int, asset_id: int, user_id: int) -> List[str]:
+    return [SESSIONS_TOPIC, f"session:{session_id}", f"asset:{asset_id}", f"user:{user_id}"]
+
+
+def jit_topics(asset_id: int, user_id: int) -> List[str]:
+    return [JIT_TOPIC, f"asset:{asset_id}", f"user:{user_id}"]
+
+
+def _coalesce_key(message: dict[str, Any]) -> Optional[str]:
+    resource = message.get("session_id", message.get("jit_request_id"))
+    if resource is None:
+        return None
+    return f"{message.get('type')}:{resource}"
+
+
+class LocalBus:
     def __init__(self) -> None:
-        self.active_connections: Set[WebSocket] = set()
+        self._handler: Optional[MessageHandler] = None
 
-    async def connect(self, websocket: WebSocket) -> None:
-        await websocket.accept()
-        self.active_connections.add(websocket)
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
 
-    def disconnect(self, websocket: WebSocket) -> None:
-        self.active_connections.discard(websocket)
+    async def publish(self, envelope: dict[str, Any]) -> None:
+        if self._handler is not None:
+            self._handler(envelope)
 
-    async def broadcast(self, message: dict[str, Any]) -> None:
-        for connection in list(self.active_connections):
+    async def stop(self) -> None:
+        self._handler = None
+
+
+class PostgresBus:
+    def __init__(self, channel: str = UPDATES_CHANNEL, reconnect_delay: float = 2.0) -> None:
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._handler: Optional[MessageHandler] = None
+        self._raw = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reconnect: Optional[asyncio.Task] = None
+
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
+        self._loop = asyncio.get_running_loop()
+        try:
+            await asyncio.to_thread(self._connect)
+        except Exception:
+            self._schedule_reconnect()
+
+    def _connect(self) -> None:
+        raw = engine.raw_connection()
+        raw.detach()
+        connection = raw.driver_connection
+        connection.autocommit = True
+        connection.cursor().execute(f"LISTEN {self.channel}")
+        self._raw = raw
+        self._loop.call_soon_threadsafe(self._loop.add_reader, connection.fileno(), self._on_readable)
+
+    def _disconnect(self) -> None:
+        raw, self._raw = self._raw, None
+        if raw is None:
+            return
+        try:
+            self._loop.remove_reader(raw.driver_connection.fileno())
+        except Exception:
+            pass
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _on_readable(self) -> None:
+        if self._raw is None:
+            return
+        connection = self._raw.driver_connection
+        try:
+            connection.poll()
+        except Exception:
+            self._disconnect()
+            self._schedule_reconnect()
+            return
+        while connection.notifies:
+            payload = connection.notifies.pop(0).payload
             try:
-                await connection.send_json(message)
+                message = json.loads(payload)
+            except ValueError:
+                continue
+            if self._handler is not None:
+                self._handler(message)
+
+    def _schedule_reconnect(self) -> None:
+        if self._handler is None or (self._reconnect is not None and not self._reconnect.done()):
+            return
+        self._reconnect = self._loop.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        while self._handler is not None and self._raw is None:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await asyncio.to_thread(self._connect)
             except Exception:
-                self.disconnect(connection)
+                continue
+
+    async def publish(self, envelope: dict[str, Any]) -> None:
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": json.dumps(envelope, default=str)},
+            )
+
+    async def stop(self) -> None:
+        self._handler = None
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+        self._disconnect()
+
+
+class ClientConnection:
+    def __init__(self, websocket: WebSocket, queue_size: int, coalesce_window: float) -> None:
+        self.websocket = websocket
+        self.queue_size = queue_size
+        self.coalesce_window = coalesce_window
+        self.topics: Set[str] = set()
+        self.dropped = 0
+        self.coalesced = 0
+        self._sequence = 0
+        self._pending: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+
+    def start(self, on_error: Callable[["ClientConnection"], None]) -> None:
+        self._sender = asyncio.create_task(self._send_loop(on_error))
+
+    def offer(self, message: dict[str, Any]) -> None:
+        key = _coalesce_key(message)
+        if key is None:
+            self._sequence += 1
+            key = f"#{self._sequence}"
+        elif key in self._pending:
+            self._pending[key] = message
+            self.coalesced += 1
+            return
+        if len(self._pending) >= self.queue_size:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[key] = message
+        self._ready.set()
+
+    async def _send_loop(self, on_error: Callable[["ClientConnection"], None]) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                if self.coalesce_window > 0:
+                    await asyncio.sleep(self.coalesce_window)
+                self._ready.clear()
+                batch = list(self._pending.values())
+                self._pending.clear()
+                for message in batch:
+                    await self.websocket.send_json(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            on_error(self)
+
+    def stop(self) -> None:
+        if self._sender is not None and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+
+
+class ConnectionManager:
+    def __init__(self, bus, queue_size: int, coalesce_window: float) -> None:
+        self.bus = bus
+        self.queue_size = queue_size
+        self.coalesce_window = coalesce_window
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.published = 0
+        self.delivered = 0
+        self._subscribers: Dict[str, Set[ClientConnection]] = {}
+
+    async def start(self) -> None:
+        await self.bus.start(self.deliver_local)
+
+    async def stop(self) -> None:
+        await self.bus.stop()
+        for client in list(self.active_connections.values()):
+            client.stop()
+        self.active_connections.clear()
+        self._subscribers.clear()
+
+    async def connect(self, websocket: WebSocket) -> ClientConnection:
+        await websocket.accept()
+        client = ClientConnection(websocket, self.queue_size, self.coalesce_window)
+        self.active_connections[websocket] = client
+        client.start(lambda failed: self.disconnect(failed.websocket))
+        return client
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        self.unsubscribe(client, list(client.topics))
+        client.stop()
+
+    def subscribe(self, client: ClientConnection, topics: Iterable[str]) -> None:
+        for topic in topics:
+            self._subscribers.setdefault(topic, set()).add(client)
+            client.topics.add(topic)
+
+    def unsubscribe(self, client: ClientConnection, topics: Iterable[str]) -> None:
+        for topic in topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._subscribers[topic]
+            client.topics.discard(topic)
+
+    def deliver_local(self, envelope: dict[str, Any]) -> None:
+        targets: Set[ClientConnection] = set()
+        for topic in envelope.get("topics") or ():
+            targets.update(self._subscribers.get(topic, ()))
+        message = envelope.get("message") or {}
+        for client in targets:
+            client.offer(message)
+        self.delivered += len(targets)
+
+    async def broadcast(self, message: dict[str, Any], topics: List[str]) -> None:
+        envelope = {"topics": topics, "message": message}
+        self.published += 1
+        try:
+            await self.bus.publish(envelope)
+        except Exception:
+            self.deliver_local(envelope)
+
+    def stats(self) -> dict[str, Any]:
+        clients = list(self.active_connections.values())
+        return {
+            "bus": type(self.bus).__name__,
+            "connections": len(clients),
+            "topics": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "coalesced": sum(client.coalesced for client in clients),
+            "dropped": sum(client.dropped for client in clients),
+        }
+
+
+def create_bus(name: str):
+    if name == "local":
+        return LocalBus()
+    if name == "postgres":
+        return PostgresBus()
+    raise ValueError(f"Unknown updates bus: {name}")
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(
+    create_bus(settings.UPDATES_BUS),
+    settings.UPDATES_CLIENT_QUEUE_SIZE,
+    settings.UPDATES_COALESCE_MS / 1000,
+)
@@ -0,0 +1,22 @@
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION audit_search_document(
+    action VARCHAR,
+    resource_type VARCHAR,
+    resource_id VARCHAR,
+    actor_id INTEGER,
+    ip VARCHAR,
+    metadata_json JSONB
+) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT lower(
+        action || ' ' || resource_type || ' ' || resource_id || ' '
+        || coalesce(actor_id::text, '') || ' '
+        || coalesce(ip, '') || ' '
+        || coalesce(metadata_json::text, '')
+    )
+$$;
+
+CREATE INDEX IF NOT EXISTS ix_audit_events_search_trgm ON audit_events
+    USING gin (audit_search_document(action, resource_type, resource_id, actor_id, ip, metadata_json) gin_trgm_ops)
@@ -0,0 +1,28 @@
+-- migrate:no-transaction
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jit_requests_approved_expires_at
+    ON jit_requests (expires_at) WHERE status = 'APPROVED';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jit_requests_user_created_at
+    ON jit_requests (user_id, created_at DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jit_requests_created_at
+    ON jit_requests (created_at DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessions_jit_request_id
+    ON sessions (jit_request_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessions_started_at
+    ON sessions (started_at DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_credentials_asset_id
+    ON credentials (asset_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_events_ts_id
+    ON audit_events (ts, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_events_action_id
+    ON audit_events (action, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_events_resource_type_id
+    ON audit_events (resource_type, id);
@@ -0,0 +1,45 @@
+DO $$
+DECLARE
+    boundary TIMESTAMP := date_trunc('month', now()) + interval '1 month';
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'audit_events'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE audit_events RENAME TO audit_events_legacy;
+    ALTER TABLE audit_events_legacy DROP CONSTRAINT audit_events_pkey;
+    ALTER INDEX IF EXISTS ix_audit_events_search_trgm RENAME TO ix_audit_events_legacy_search_trgm;
+    ALTER INDEX IF EXISTS ix_audit_events_ts_id RENAME TO ix_audit_events_legacy_ts_id;
+    ALTER INDEX IF EXISTS ix_audit_events_action_id RENAME TO ix_audit_events_legacy_action_id;
+    ALTER INDEX IF EXISTS ix_audit_events_resource_type_id RENAME TO ix_audit_events_legacy_resource_type_id;
+
+    UPDATE audit_events_legacy SET ts = NOW() WHERE ts IS NULL;
+    ALTER TABLE audit_events_legacy ALTER COLUMN ts SET NOT NULL;
+    ALTER TABLE audit_events_legacy ADD CONSTRAINT audit_events_legacy_pkey PRIMARY KEY (id, ts);
+
+    CREATE TABLE audit_events (
+        id INTEGER NOT NULL DEFAULT nextval('audit_events_id_seq'),
+        actor_id INTEGER REFERENCES users(id),
+        action VARCHAR(100) NOT NULL,
+        resource_type VARCHAR(100) NOT NULL,
+        resource_id VARCHAR(100) NOT NULL,
+        ts TIMESTAMP NOT NULL DEFAULT NOW(),
+        ip VARCHAR(50),
+        metadata_json JSONB,
+        PRIMARY KEY (id, ts)
+    ) PARTITION BY RANGE (ts);
+    ALTER SEQUENCE audit_events_id_seq OWNED BY audit_events.id;
+
+    CREATE INDEX ix_audit_events_search_trgm ON audit_events
+        USING gin (audit_search_document(action, resource_type, resource_id, actor_id, ip, metadata_json) gin_trgm_ops);
+    CREATE INDEX ix_audit_events_ts_id ON audit_events (ts, id);
+    CREATE INDEX ix_audit_events_action_id ON audit_events (action, id);
+    CREATE INDEX ix_audit_events_resource_type_id ON audit_events (resource_type, id);
+
+    EXECUTE format(
+        'ALTER TABLE audit_events ATTACH PARTITION audit_events_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+        boundary
+    );
+    CREATE TABLE audit_events_default PARTITION OF audit_events DEFAULT;
+END
+$$
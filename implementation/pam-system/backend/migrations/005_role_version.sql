@@ -0,0 +1,24 @@
+ALTER TABLE users ADD COLUMN IF NOT EXISTS role_version INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_user_role_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'users' THEN
+        NEW.role_version := OLD.role_version + 1;
+        RETURN NEW;
+    END IF;
+    UPDATE users SET role_version = role_version + 1
+    WHERE id = COALESCE(NEW.user_id, OLD.user_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS user_roles_bump_role_version ON user_roles;
+CREATE TRIGGER user_roles_bump_role_version
+    AFTER INSERT OR UPDATE OR DELETE ON user_roles
+    FOR EACH ROW EXECUTE FUNCTION bump_user_role_version();
+
+DROP TRIGGER IF EXISTS users_bump_role_version ON users;
+CREATE TRIGGER users_bump_role_version
+    BEFORE UPDATE OF is_admin ON users
+    FOR EACH ROW WHEN (OLD.is_admin IS DISTINCT FROM NEW.is_admin)
+    EXECUTE FUNCTION bump_user_role_version();
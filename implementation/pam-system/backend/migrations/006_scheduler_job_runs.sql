@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS scheduler_job_runs (
+    job_name VARCHAR(100) PRIMARY KEY,
+    runner VARCHAR(255) NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    duration_ms DOUBLE PRECISION NOT NULL,
+    lag_ms DOUBLE PRECISION NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    error TEXT
+);
@@ -0,0 +1,18 @@
+CREATE OR REPLACE FUNCTION bump_user_role_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'users' THEN
+        NEW.role_version := OLD.role_version + 1;
+        PERFORM pg_notify('pam_principal', NEW.id::text);
+        RETURN NEW;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE users SET role_version = role_version + 1 WHERE id = OLD.user_id;
+        PERFORM pg_notify('pam_principal', OLD.user_id::text);
+    END IF;
+    IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.user_id IS DISTINCT FROM OLD.user_id) THEN
+        UPDATE users SET role_version = role_version + 1 WHERE id = NEW.user_id;
+        PERFORM pg_notify('pam_principal', NEW.user_id::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
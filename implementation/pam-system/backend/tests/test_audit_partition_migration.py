@@ -0,0 +1,67 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.db import _split_statements, engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "migrations")
+
+
+def _database_available() -> bool:
+    try:
+        with engine.connect():
+            return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _database_available(), reason="Postgres is not reachable at DATABASE_URL")
+
+
+def _apply(conn, name: str) -> None:
+    with open(os.path.join(MIGRATIONS_DIR, name), "r", encoding="utf-8") as handle:
+        for statement in _split_statements(handle.read()):
+            conn.execute(text(statement))
+
+
+@pytest.fixture
+def schema():
+    name = f"migration_{uuid.uuid4().hex[:12]}"
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"CREATE SCHEMA {name}"))
+        conn.execute(text(f"SET search_path TO {name}, public"))
+        try:
+            yield conn
+        finally:
+            conn.execute(text("SET search_path TO DEFAULT"))
+            conn.execute(text(f"DROP SCHEMA {name} CASCADE"))
+
+
+def test_partition_migration_keeps_existing_audit_rows(schema):
+    _apply(schema, "001_init.sql")
+    schema.execute(
+        text(
+            "INSERT INTO audit_events (action, resource_type, resource_id, ts) VALUES "
+            "('login', 'user', '1', NOW() - interval '90 days'), "
+            "('login', 'user', '2', NOW()), "
+            "('logout', 'user', '2', NULL)"
+        )
+    )
+    _apply(schema, "002_audit_search.sql")
+    _apply(schema, "003_hot_path_indexes.sql")
+    _apply(schema, "004_audit_partitions.sql")
+
+    assert schema.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'audit_events'::regclass)")
+    ).scalar()
+    assert schema.execute(text("SELECT COUNT(*) FROM audit_events")).scalar() == 3
+    assert schema.execute(text("SELECT COUNT(*) FROM audit_events WHERE ts IS NULL")).scalar() == 0
+    assert schema.execute(text("SELECT COUNT(*) FROM audit_events_legacy")).scalar() == 3
+
+    highest = schema.execute(text("SELECT MAX(id) FROM audit_events")).scalar()
+    inserted = schema.execute(
+        text("INSERT INTO audit_events (action, resource_type, resource_id) VALUES ('login', 'user', '3') RETURNING id")
+    ).scalar()
+    assert inserted > highest
@@ -0,0 +1,112 @@
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.core.deps import authenticate_claims, decode_access_claims, require_admin, require_role
+from app.core.principals import NOTIFY_CHANNEL, get_user_role_names, load_principal, principal_cache
+from app.core.security import create_user_access_token
+from app.db import SessionLocal, engine, run_migrations
+from app.models import Role, User, UserRole
+
+
+def _database_available() -> bool:
+    try:
+        with engine.connect():
+            return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _database_available(), reason="Postgres is not reachable at DATABASE_URL")
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture(scope="module", autouse=True)
+def listener():
+    run_migrations()
+    principal_cache.start_listener()
+
+    def probe() -> bool:
+        principal_cache.put(-1, {}, [])
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, '-1')"), {"channel": NOTIFY_CHANNEL})
+        return _wait_for(lambda: principal_cache.get(-1) is None, timeout=0.5)
+
+    assert _wait_for(probe), "principal invalidation listener did not start"
+    yield
+    principal_cache.stop_listener()
+
+
+@pytest.fixture
+def principal():
+    suffix = uuid.uuid4().hex[:12]
+    with SessionLocal() as db:
+        role = Role(name=f"revocation-{suffix}")
+        user = User(email=f"revocation-{suffix}@example.com", password_hash="x", is_admin=False)
+        db.add_all([role, user])
+        db.flush()
+        db.add(UserRole(user_id=user.id, role_id=role.id))
+        db.commit()
+        user_id, role_id, role_name = user.id, role.id, role.name
+    yield user_id, role_id, role_name
+    with SessionLocal() as db:
+        db.query(UserRole).filter(UserRole.user_id == user_id).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.query(Role).filter(Role.id == role_id).delete()
+        db.commit()
+
+
+def _cached_claims(user_id: int) -> dict:
+    principal_cache.invalidate(user_id)
+    with SessionLocal() as db:
+        user = load_principal(db, user_id)
+        token = create_user_access_token(user.id, get_user_role_names(db, user), user.is_admin, user.role_version)
+    assert principal_cache.get(user_id) is not None
+    return decode_access_claims(token)
+
+
+def test_revoked_role_is_rejected_before_cache_ttl(principal):
+    user_id, role_id, role_name = principal
+    claims = _cached_claims(user_id)
+    with SessionLocal() as db:
+        require_role(role_name)(authenticate_claims(db, claims), claims, db)
+
+    with SessionLocal() as db:
+        db.query(UserRole).filter(UserRole.user_id == user_id, UserRole.role_id == role_id).delete()
+        db.commit()
+    assert _wait_for(lambda: principal_cache.get(user_id) is None, timeout=2.0)
+
+    with SessionLocal() as db:
+        with pytest.raises(HTTPException) as rejected:
+            require_role(role_name)(authenticate_claims(db, claims), claims, db)
+    assert rejected.value.status_code == 403
+
+
+def test_revoked_admin_is_rejected_before_cache_ttl(principal):
+    user_id, _, _ = principal
+    with SessionLocal() as db:
+        db.execute(text("UPDATE users SET is_admin = TRUE WHERE id = :id"), {"id": user_id})
+        db.commit()
+    claims = _cached_claims(user_id)
+    assert claims["adm"] is True
+    with SessionLocal() as db:
+        require_admin(authenticate_claims(db, claims), claims)
+        db.execute(text("UPDATE users SET is_admin = FALSE WHERE id = :id"), {"id": user_id})
+        db.commit()
+    assert _wait_for(lambda: principal_cache.get(user_id) is None, timeout=2.0)
+
+    with SessionLocal() as db:
+        with pytest.raises(HTTPException) as rejected:
+            require_admin(authenticate_claims(db, claims), claims)
+    assert rejected.value.status_code == 403
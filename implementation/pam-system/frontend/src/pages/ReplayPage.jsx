@@ -27,34 +27,56 @@ export default function ReplayPage() {
     term.open(termRef.current);
     fitAddon.fit();
 
-    const load = async () => {
-      const response = await apiFetch(`/sessions/${id}/recording`);
-      if (!response.ok) {
-        setStatus("Recording not available.");
-        return;
-      }
-      const text = await response.text();
-      const lines = text.split("\n").filter(Boolean);
-      if (!lines.length) {
-        setStatus("Recording empty.");
-        return;
-      }
-      const entries = lines.map((line) => JSON.parse(line));
-      const start = entries[0].ts;
+    let cancelled = false;
+    let start = null;
+    let playStart = 0;
+    let lastOffset = 0;
+
+    const schedule = (entries) => {
       entries.forEach((entry) => {
-        const delay = Math.max(0, (entry.ts - start) * 1000);
+        if (start === null) {
+          start = entry.ts;
+          playStart = performance.now();
+        }
+        const offsetMs = Math.max(0, (entry.ts - start) * 1000);
+        lastOffset = Math.max(lastOffset, offsetMs);
+        const delay = Math.max(0, offsetMs - (performance.now() - playStart));
         const timerId = window.setTimeout(() => {
           const data = decodeBase64(entry.data);
           term.write(data);
         }, delay);
         timersRef.current.push(timerId);
       });
-      setStatus("Playing");
-      const lastEntry = entries[entries.length - 1];
-      const endDelay = Math.max(0, (lastEntry.ts - start) * 1000) + 150;
+    };
+
+    const load = async () => {
+      let offset = 0;
+      while (!cancelled) {
+        const response = await apiFetch(`/sessions/${id}/recording/chunks?offset=${offset}&limit=500`);
+        if (!response.ok) {
+          setStatus("Recording not available.");
+          return;
+        }
+        const page = await response.json();
+        schedule(page.items);
+        if (start !== null) {
+          setStatus("Playing");
+        }
+        if (page.eof || page.next_offset === offset) {
+          break;
+        }
+        offset = page.next_offset;
+      }
+      if (cancelled) {
+        return;
+      }
+      if (start === null) {
+        setStatus("Recording empty.");
+        return;
+      }
       const endTimer = window.setTimeout(() => {
         setStatus("Playback finished.");
-      }, endDelay);
+      }, Math.max(0, lastOffset - (performance.now() - playStart)) + 150);
       timersRef.current.push(endTimer);
     };
 
@@ -62,6 +84,7 @@ export default function ReplayPage() {
     window.addEventListener("resize", () => fitAddon.fit());
 
     return () => {
+      cancelled = true;
       timersRef.current.forEach((timerId) => window.clearTimeout(timerId));
       timersRef.current = [];
       term.dispose();
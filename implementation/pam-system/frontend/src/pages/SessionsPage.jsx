@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
-import API_URL, { apiFetch, getErrorMessage } from "../api";
+import API_URL, { apiFetch, getErrorMessage, getTokens } from "../api";
 import { useToast } from "../components/ToastProvider";
 import { useAuth } from "../App";
 
@@ -37,15 +37,22 @@ export default function SessionsPage() {
 
   useEffect(() => {
     load();
-    if (!user?.is_admin) {
+    const token = getTokens().access;
+    if (!user || !token) {
       return undefined;
     }
+    const topics = user.is_admin ? "sessions,jit" : `user:${user.id}`;
     const wsUrl = API_URL.replace(/^http/, "ws") + "/ws/updates";
-    const socket = new WebSocket(wsUrl);
-    socket.onmessage = () => load();
+    const socket = new WebSocket(`${wsUrl}?token=${token}&topics=${topics}`);
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type !== "subscribed" && message.type !== "unsubscribed" && message.type !== "error") {
+        load();
+      }
+    };
     socket.onerror = () => addToast("Live updates disconnected.", "error");
     return () => socket.close();
-  }, [user?.is_admin]);
+  }, [user?.id, user?.is_admin]);
 
   const startSession = async (jitId) => {
     const response = await apiFetch("/sessions/start", {
@@ -1,17 +1,18 @@
 import asyncio
-import base64
 import json
 import os
-import threading
 import time
 from typing import Optional
 
 import jwt
-import paramiko
-import requests
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketState
 
+from app.outbox import SessionEndOutbox
+from app.recorder import RecordingPipeline
+from app.ssh_engines import create_ssh_engine
+from app.vault import VaultClient
+
 GATEWAY_JWT_SECRET = os.getenv("GATEWAY_JWT_SECRET", "dev-gateway-secret")
 VAULT_ADDR = os.getenv("VAULT_ADDR", "http://vault:8200")
 VAULT_TOKEN = os.getenv("VAULT_TOKEN", "root")
@@ -19,19 +20,59 @@ VAULT_KV_MOUNT = os.getenv("VAULT_KV_MOUNT", "secret")
 BACKEND_INTERNAL_URL = os.getenv("BACKEND_INTERNAL_URL", "http://backend:8000")
 GATEWAY_API_KEY = os.getenv("GATEWAY_API_KEY", "dev-gateway-key")
 RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", "/data/recordings")
+SSH_ENGINE = os.getenv("GATEWAY_SSH_ENGINE", "paramiko")
+PUMP_WORKERS = int(os.getenv("GATEWAY_PUMP_WORKERS", "2"))
+SSH_POOL_MAX_CHANNELS = int(os.getenv("GATEWAY_SSH_POOL_MAX_CHANNELS", "0"))
+SSH_POOL_IDLE_SECONDS = float(os.getenv("GATEWAY_SSH_POOL_IDLE_SECONDS", "60"))
+RECORDING_QUEUE_SIZE = int(os.getenv("RECORDING_QUEUE_SIZE", "10000"))
+RECORDING_FLUSH_BYTES = int(os.getenv("RECORDING_FLUSH_BYTES", "65536"))
+RECORDING_FLUSH_INTERVAL = float(os.getenv("RECORDING_FLUSH_INTERVAL", "0.25"))
+RECORDING_QUEUE_POLICY = os.getenv("RECORDING_QUEUE_POLICY", "block")
+RECORDING_BLOCK_TIMEOUT = float(os.getenv("RECORDING_BLOCK_TIMEOUT", "1.0"))
+RECORDING_SPILL_LIMIT = int(os.getenv("RECORDING_SPILL_LIMIT", "1000"))
+RECORDING_FORMAT = os.getenv("RECORDING_FORMAT", "jsonl")
+VAULT_CACHE_TTL = float(os.getenv("VAULT_CACHE_TTL", "30"))
+VAULT_CACHE_SIZE = int(os.getenv("VAULT_CACHE_SIZE", "1024"))
+VAULT_MAX_CONNECTIONS = int(os.getenv("VAULT_MAX_CONNECTIONS", "20"))
+VAULT_TIMEOUT = float(os.getenv("VAULT_TIMEOUT", "5"))
+SESSION_END_OUTBOX = os.getenv("SESSION_END_OUTBOX", "/data/outbox/session-end.jsonl")
+SESSION_END_BATCH_SIZE = int(os.getenv("SESSION_END_BATCH_SIZE", "100"))
+SESSION_END_FLUSH_INTERVAL = float(os.getenv("SESSION_END_FLUSH_INTERVAL", "0.2"))
+SESSION_END_MAX_BACKOFF = float(os.getenv("SESSION_END_MAX_BACKOFF", "30"))
 
 app = FastAPI(title="PAM Gateway")
-
-
-def _vault_headers() -> dict:
-    return {"X-Vault-Token": VAULT_TOKEN}
-
-
-def _read_secret(vault_path: str) -> dict:
-    url = f"{VAULT_ADDR}/v1/{VAULT_KV_MOUNT}/data/{vault_path}"
-    response = requests.get(url, headers=_vault_headers(), timeout=5)
-    response.raise_for_status()
-    return response.json()["data"]["data"]
+ssh_engine = create_ssh_engine(
+    SSH_ENGINE,
+    pump_workers=PUMP_WORKERS,
+    pool_max_channels=SSH_POOL_MAX_CHANNELS,
+    pool_idle_timeout=SSH_POOL_IDLE_SECONDS,
+)
+recorder = RecordingPipeline(
+    max_queue=RECORDING_QUEUE_SIZE,
+    flush_bytes=RECORDING_FLUSH_BYTES,
+    flush_interval=RECORDING_FLUSH_INTERVAL,
+    policy=RECORDING_QUEUE_POLICY,
+    block_timeout=RECORDING_BLOCK_TIMEOUT,
+    spill_limit=RECORDING_SPILL_LIMIT,
+)
+vault = VaultClient(
+    addr=VAULT_ADDR,
+    token=VAULT_TOKEN,
+    mount=VAULT_KV_MOUNT,
+    cache_ttl=VAULT_CACHE_TTL,
+    cache_size=VAULT_CACHE_SIZE,
+    max_connections=VAULT_MAX_CONNECTIONS,
+    timeout=VAULT_TIMEOUT,
+)
+session_end_outbox = SessionEndOutbox(
+    path=SESSION_END_OUTBOX,
+    backend_url=BACKEND_INTERNAL_URL,
+    api_key=GATEWAY_API_KEY,
+    batch_size=SESSION_END_BATCH_SIZE,
+    flush_interval=SESSION_END_FLUSH_INTERVAL,
+    max_backoff=SESSION_END_MAX_BACKOFF,
+    timeout=5,
+)
 
 
 def _decode_token(token: str) -> dict:
@@ -42,20 +83,30 @@ def _ensure_recording_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def _write_json_line(handle, payload: dict) -> None:
-    handle.write(json.dumps(payload, separators=(",", ":")) + "\n")
-    handle.flush()
+def _write_meta(path: str, payload: dict) -> None:
+    with open(path, "w", encoding="utf-8") as meta_handle:
+        json.dump(payload, meta_handle)
 
 
-async def _notify_session_end(session_id: int) -> None:
-    try:
-        requests.post(
-            f"{BACKEND_INTERNAL_URL}/sessions/{session_id}/end",
-            headers={"X-Gateway-Api-Key": GATEWAY_API_KEY},
-            timeout=5,
-        )
-    except Exception:
-        pass
+async def _close_websocket(websocket: WebSocket) -> None:
+    if websocket.client_state == WebSocketState.CONNECTED:
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass
+
+
+@app.on_event("startup")
+async def on_startup() -> None:
+    await session_end_outbox.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    ssh_engine.shutdown()
+    recorder.shutdown()
+    await vault.close()
+    await session_end_outbox.stop()
 
 
 @app.websocket("/ws")
@@ -78,7 +129,7 @@ async def websocket_proxy(websocket: WebSocket) -> None:
     recording_path = claims.get("recording_path", f"recordings/session-{session_id}.log")
 
     try:
-        secret = _read_secret(vault_path)
+        secret = await vault.read_kv2(vault_path)
     except Exception:
         await websocket.close(code=1011)
         return
@@ -89,11 +140,8 @@ async def websocket_proxy(websocket: WebSocket) -> None:
         await websocket.close(code=1011)
         return
 
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     try:
-        client.connect(asset_host, port=asset_port, username=username, password=password)
-        channel = client.invoke_shell(term="xterm")
+        ssh_session = await ssh_engine.open(asset_host, asset_port, username, password, pool_key=vault_path)
     except Exception:
         await websocket.close(code=1011)
         return
@@ -103,42 +151,28 @@ async def websocket_proxy(websocket: WebSocket) -> None:
     cmd_log_file = os.path.join(RECORDINGS_DIR, f"session-{session_id}.cmd.log")
     meta_file = os.path.join(RECORDINGS_DIR, f"session-{session_id}.meta.json")
 
-    with open(meta_file, "w", encoding="utf-8") as meta_handle:
-        json.dump(
-            {
-                "session_id": session_id,
-                "asset_host": asset_host,
-                "asset_port": asset_port,
-                "vault_path": vault_path,
-            },
-            meta_handle,
-        )
-
-    output_handle = open(recording_file, "w", encoding="utf-8")
-    cmd_handle = open(cmd_log_file, "w", encoding="utf-8")
-
-    stop_event = threading.Event()
-    loop = asyncio.get_running_loop()
+    meta = {
+        "session_id": session_id,
+        "asset_host": asset_host,
+        "asset_port": asset_port,
+        "vault_path": vault_path,
+        "recording_format": RECORDING_FORMAT,
+        "ssh_engine": ssh_engine.name,
+    }
+    _write_meta(meta_file, meta)
+
+    if RECORDING_FORMAT.startswith("binary"):
+        base, _ = os.path.splitext(recording_file)
+        recording_file = f"{base}.rec"
+    output_sink = recorder.open(recording_file, fmt=RECORDING_FORMAT)
+    cmd_sink = recorder.open(cmd_log_file)
+
     cmd_buffer = ""
 
-    def ssh_reader() -> None:
-        while not stop_event.is_set():
-            if channel.recv_ready():
-                data = channel.recv(4096)
-                if not data:
-                    break
-                payload = {
-                    "ts": time.time(),
-                    "data": base64.b64encode(data).decode("ascii"),
-                }
-                _write_json_line(output_handle, payload)
-                asyncio.run_coroutine_threadsafe(websocket.send_bytes(data), loop)
-            else:
-                time.sleep(0.01)
-        stop_event.set()
-
-    thread = threading.Thread(target=ssh_reader, daemon=True)
-    thread.start()
+    async def on_ssh_close() -> None:
+        await _close_websocket(websocket)
+
+    ssh_session.start(output_sink, websocket.send_bytes, on_ssh_close)
 
     try:
         while True:
@@ -152,29 +186,23 @@ async def websocket_proxy(websocket: WebSocket) -> None:
             elif message.get("text") is not None:
                 data = message["text"].encode()
             if data:
-                channel.send(data)
+                await ssh_session.send(data)
                 decoded = data.decode(errors="ignore")
                 for char in decoded:
                     if char in ["\n", "\r"]:
                         if cmd_buffer.strip():
-                            _write_json_line(
-                                cmd_handle,
-                                {"ts": time.time(), "line": cmd_buffer.strip()},
-                            )
+                            cmd_sink.write({"ts": time.time(), "line": cmd_buffer.strip()})
                         cmd_buffer = ""
                     else:
                         cmd_buffer += char
     except WebSocketDisconnect:
         pass
     finally:
-        stop_event.set()
-        try:
-            channel.close()
-            client.close()
-        except Exception:
-            pass
-        output_handle.close()
-        cmd_handle.close()
-        await _notify_session_end(session_id)
+        await ssh_session.close()
+        await asyncio.to_thread(output_sink.close, 10)
+        await asyncio.to_thread(cmd_sink.close, 10)
+        _write_meta(meta_file, {**meta, "recording": output_sink.stats(), "commands": cmd_sink.stats()})
+        if session_id is not None:
+            await session_end_outbox.add(int(session_id))
         if websocket.client_state == WebSocketState.CONNECTED:
             await websocket.close()
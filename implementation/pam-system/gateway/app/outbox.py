@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+
+class SessionEndOutbox:
+    def __init__(
+        self,
+        path: str,
+        backend_url: str,
+        api_key: str,
+        batch_size: int,
+        flush_interval: float,
+        max_backoff: float,
+        timeout: float,
+    ) -> None:
+        self.path = path
+        self.backend_url = backend_url.rstrip("/")
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.delivered = 0
+        self.failed_attempts = 0
+        self._pending: Dict[int, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._file_lock = asyncio.Lock()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                    session_id = int(entry["session_id"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if entry.get("op") == "ack":
+                    self._pending.pop(session_id, None)
+                else:
+                    self._pending[session_id] = float(entry.get("ended_at") or time.time())
+
+    def _append(self, entries: List[dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def _rewrite(self, pending: Dict[int, float]) -> None:
+        partial = f"{self.path}.partial"
+        with open(partial, "w", encoding="utf-8") as handle:
+            for session_id, ended_at in pending.items():
+                handle.write(json.dumps({"op": "add", "session_id": session_id, "ended_at": ended_at}) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(partial, self.path)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        await asyncio.to_thread(self._load)
+        async with self._file_lock:
+            await asyncio.to_thread(self._rewrite, dict(self._pending))
+        self._client = httpx.AsyncClient(
+            base_url=self.backend_url,
+            headers={"X-Gateway-Api-Key": self.api_key},
+            timeout=self.timeout,
+        )
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if self._pending:
+            self._wakeup.set()
+
+    async def add(self, session_id: int, ended_at: Optional[float] = None) -> None:
+        ended_at = ended_at or time.time()
+        async with self._file_lock:
+            await asyncio.to_thread(
+                self._append,
+                [{"op": "add", "session_id": session_id, "ended_at": ended_at}],
+            )
+        self._pending[session_id] = ended_at
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _deliver(self, batch: Dict[int, float]) -> None:
+        items = [{"session_id": session_id, "ended_at": ended_at} for session_id, ended_at in batch.items()]
+        response = await self._client.post("/sessions/end", json={"items": items})
+        response.raise_for_status()
+        for session_id, ended_at in batch.items():
+            if self._pending.get(session_id) == ended_at:
+                del self._pending[session_id]
+        self.delivered += len(batch)
+        async with self._file_lock:
+            if self._pending:
+                acks = [{"op": "ack", "session_id": session_id} for session_id in batch]
+                await asyncio.to_thread(self._append, acks)
+            else:
+                await asyncio.to_thread(self._rewrite, {})
+
+    async def _run(self) -> None:
+        backoff = self.flush_interval
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.sleep(self.flush_interval)
+            while self._pending:
+                batch = dict(list(self._pending.items())[: self.batch_size])
+                try:
+                    await self._deliver(batch)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    self.failed_attempts += 1
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+                backoff = self.flush_interval
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pending and self._client is not None:
+            try:
+                await asyncio.wait_for(self._deliver(dict(self._pending)), timeout)
+            except Exception:
+                pass
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,176 @@
+import itertools
+import selectors
+import socket
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DataCallback = Callable[[bytes], None]
+CloseCallback = Callable[[], None]
+
+
+class _PumpWorker:
+    def __init__(self, name: str, chunk_size: int) -> None:
+        self.chunk_size = chunk_size
+        self.selector = selectors.DefaultSelector()
+        self.channel_count = 0
+        self._pending: List[Tuple[str, Any, Optional[DataCallback], Optional[CloseCallback]]] = []
+        self._lock = threading.Lock()
+        self._fds: Dict[int, int] = {}
+        self._stopped = False
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        op: str,
+        channel: Any,
+        on_data: Optional[DataCallback] = None,
+        on_close: Optional[CloseCallback] = None,
+    ) -> None:
+        with self._lock:
+            self._pending.append((op, channel, on_data, on_close))
+            if op == "add":
+                self.channel_count += 1
+        self._wake()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake()
+        self._thread.join(timeout=2)
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _drain_wakeups(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _apply_pending(self, callbacks: Dict[int, Tuple[Any, DataCallback, CloseCallback]]) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for op, channel, on_data, on_close in pending:
+            if op == "add":
+                try:
+                    fd = channel.fileno()
+                    previous = callbacks.get(fd)
+                    if previous is not None and previous[0] is channel:
+                        with self._lock:
+                            self.channel_count -= 1
+                    else:
+                        if previous is not None:
+                            self._detach(callbacks, fd, notify=True)
+                        try:
+                            self.selector.register(fd, selectors.EVENT_READ, fd)
+                        except KeyError:
+                            self.selector.modify(fd, selectors.EVENT_READ, fd)
+                except (OSError, ValueError, KeyError):
+                    with self._lock:
+                        self.channel_count -= 1
+                    try:
+                        on_close()
+                    except Exception:
+                        pass
+                    continue
+                callbacks[fd] = (channel, on_data, on_close)
+                self._fds[id(channel)] = fd
+            else:
+                fd = self._fds.get(id(channel))
+                if fd is not None:
+                    self._detach(callbacks, fd, notify=False)
+
+    def _detach(self, callbacks: Dict[int, Tuple[Any, DataCallback, CloseCallback]], fd: int, notify: bool) -> None:
+        entry = callbacks.pop(fd, None)
+        if entry is None:
+            return
+        self._fds.pop(id(entry[0]), None)
+        try:
+            self.selector.unregister(fd)
+        except (KeyError, ValueError):
+            pass
+        with self._lock:
+            self.channel_count -= 1
+        if notify:
+            try:
+                entry[2]()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        callbacks: Dict[int, Tuple[Any, DataCallback, CloseCallback]] = {}
+        while not self._stopped:
+            for key, _ in self.selector.select():
+                fd = key.data
+                if fd is None:
+                    self._drain_wakeups()
+                    continue
+                entry = callbacks.get(fd)
+                if entry is None:
+                    continue
+                channel, on_data, _ = entry
+                try:
+                    data = channel.recv(self.chunk_size)
+                except Exception:
+                    data = b""
+                if not data:
+                    self._detach(callbacks, fd, notify=True)
+                    continue
+                try:
+                    on_data(data)
+                except Exception:
+                    pass
+            self._apply_pending(callbacks)
+        for fd in list(callbacks):
+            self._detach(callbacks, fd, notify=True)
+        self.selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+
+class ChannelPump:
+    def __init__(self, workers: int = 2, chunk_size: int = 4096) -> None:
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self._workers: List[_PumpWorker] = []
+        self._assigned: Dict[int, _PumpWorker] = {}
+        self._lock = threading.Lock()
+        self._names = itertools.count()
+
+    def _ensure_started(self) -> None:
+        if not self._workers:
+            self._workers = [
+                _PumpWorker(f"ssh-pump-{next(self._names)}", self.chunk_size) for _ in range(self.workers)
+            ]
+
+    def register(self, channel: Any, on_data: DataCallback, on_close: CloseCallback) -> None:
+        with self._lock:
+            self._ensure_started()
+            worker = min(self._workers, key=lambda item: item.channel_count)
+            self._assigned[id(channel)] = worker
+        worker.submit("add", channel, on_data, on_close)
+
+    def unregister(self, channel: Any) -> None:
+        with self._lock:
+            worker = self._assigned.pop(id(channel), None)
+        if worker is not None:
+            worker.submit("remove", channel)
+
+    def active_channels(self) -> int:
+        with self._lock:
+            return sum(worker.channel_count for worker in self._workers)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._assigned.clear()
+        for worker in workers:
+            worker.stop()
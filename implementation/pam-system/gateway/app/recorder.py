@@ -0,0 +1,245 @@
+import base64
+import json
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+_CLOSE = object()
+
+BINARY_MAGIC = b"PAMREC\x01\n"
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+BLOCK_HEADER = struct.Struct(">BII")
+RECORD_HEADER = struct.Struct(">dI")
+INDEX_ENTRY = struct.Struct(">ddQ")
+
+
+def _encode_line(payload: Dict[str, Any]) -> bytes:
+    if isinstance(payload.get("data"), (bytes, bytearray)):
+        payload = {**payload, "data": base64.b64encode(payload["data"]).decode("ascii")}
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class RecordingSink:
+    def __init__(self, pipeline: "RecordingPipeline", path: str) -> None:
+        self.pipeline = pipeline
+        self.path = path
+        self.handle = open(path, "wb")
+        self.written_bytes = 0
+        self.dropped_chunks = 0
+        self.dropped_bytes = 0
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._first_buffered_at = 0.0
+        self._closed = threading.Event()
+        self._spill: Deque[Any] = deque()
+        self._spilling = False
+        self._spill_lock = threading.Lock()
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        return _encode_line(payload)
+
+    def write_chunk(self, chunk: bytes) -> None:
+        self.handle.write(chunk)
+        self.handle.flush()
+
+    def close_handles(self) -> None:
+        self.handle.close()
+
+    def write(self, payload: Dict[str, Any]) -> None:
+        self.pipeline.enqueue(self, payload)
+
+    def write_output(self, data: bytes) -> None:
+        self.write({"ts": time.time(), "data": data})
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self.pipeline.enqueue(self, _CLOSE)
+        self._closed.wait(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "written_bytes": self.written_bytes,
+            "dropped_chunks": self.dropped_chunks,
+            "dropped_bytes": self.dropped_bytes,
+        }
+
+
+class BinaryRecordingSink(RecordingSink):
+    def __init__(self, pipeline: "RecordingPipeline", path: str, compress: bool = True) -> None:
+        super().__init__(pipeline, path)
+        self.codec = CODEC_ZLIB if compress else CODEC_NONE
+        self.index_handle = open(f"{path}.idx", "wb")
+        self.handle.write(BINARY_MAGIC)
+        self._offset = len(BINARY_MAGIC)
+        self._block_first_ts: Optional[float] = None
+        self._block_last_ts = 0.0
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        data = payload.get("data") or b""
+        if self._block_first_ts is None:
+            self._block_first_ts = payload["ts"]
+        self._block_last_ts = payload["ts"]
+        return RECORD_HEADER.pack(payload["ts"], len(data)) + data
+
+    def write_chunk(self, chunk: bytes) -> None:
+        stored = zlib.compress(chunk) if self.codec == CODEC_ZLIB else chunk
+        block = BLOCK_HEADER.pack(self.codec, len(chunk), len(stored)) + stored
+        self.handle.write(block)
+        self.handle.flush()
+        self.index_handle.write(INDEX_ENTRY.pack(self._block_first_ts, self._block_last_ts, self._offset))
+        self.index_handle.flush()
+        self._offset += len(block)
+        self._block_first_ts = None
+
+    def close_handles(self) -> None:
+        super().close_handles()
+        self.index_handle.close()
+
+
+class RecordingPipeline:
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        flush_bytes: int = 65536,
+        flush_interval: float = 0.25,
+        policy: str = "block",
+        block_timeout: float = 1.0,
+        spill_limit: int = 1000,
+    ) -> None:
+        if policy not in {"block", "drop"}:
+            raise ValueError(f"Unknown recording queue policy: {policy}")
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.spill_limit = spill_limit
+        self.dropped_chunks = 0
+        self._queue: "queue.Queue[Tuple[RecordingSink, Any]]" = queue.Queue(maxsize=max_queue)
+        self._dirty: Dict[int, RecordingSink] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._spill_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recording-spill")
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+                self._thread.start()
+
+    def open(self, path: str, fmt: str = "jsonl") -> RecordingSink:
+        self._ensure_started()
+        if fmt == "binary":
+            return BinaryRecordingSink(self, path, compress=True)
+        if fmt == "binary-raw":
+            return BinaryRecordingSink(self, path, compress=False)
+        return RecordingSink(self, path)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def enqueue(self, sink: RecordingSink, payload: Any) -> None:
+        with sink._spill_lock:
+            if not sink._spill:
+                try:
+                    self._queue.put_nowait((sink, payload))
+                    return
+                except queue.Full:
+                    pass
+            if payload is not _CLOSE and (self.policy == "drop" or len(sink._spill) >= self.spill_limit):
+                self._record_drop(sink, payload)
+                return
+            sink._spill.append(payload)
+            if sink._spilling:
+                return
+            sink._spilling = True
+        self._spill_executor.submit(self._drain_spill, sink)
+
+    def _drain_spill(self, sink: RecordingSink) -> None:
+        while True:
+            with sink._spill_lock:
+                if not sink._spill:
+                    sink._spilling = False
+                    return
+                payload = sink._spill[0]
+            try:
+                self._queue.put((sink, payload), timeout=self.block_timeout)
+            except queue.Full:
+                writer_alive = self._thread is not None and self._thread.is_alive()
+                if payload is _CLOSE and writer_alive:
+                    continue
+                if payload is not _CLOSE:
+                    self._record_drop(sink, payload)
+            with sink._spill_lock:
+                sink._spill.popleft()
+
+    def _record_drop(self, sink: RecordingSink, payload: Dict[str, Any]) -> None:
+        data = payload.get("data") or payload.get("line") or b""
+        with self._lock:
+            self.dropped_chunks += 1
+            sink.dropped_chunks += 1
+            sink.dropped_bytes += len(data)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._spill_executor.shutdown(wait=False, cancel_futures=True)
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _flush(self, sink: RecordingSink) -> None:
+        self._dirty.pop(id(sink), None)
+        if not sink._buffer:
+            return
+        chunk = b"".join(sink._buffer)
+        sink._buffer = []
+        sink._buffered = 0
+        try:
+            sink.write_chunk(chunk)
+            sink.written_bytes += len(chunk)
+        except (OSError, ValueError):
+            sink.dropped_bytes += len(chunk)
+
+    def _handle(self, sink: RecordingSink, payload: Any) -> None:
+        if payload is _CLOSE:
+            self._flush(sink)
+            try:
+                sink.close_handles()
+            finally:
+                sink._closed.set()
+            return
+        line = sink.encode(payload)
+        if not sink._buffer:
+            sink._first_buffered_at = time.monotonic()
+            self._dirty[id(sink)] = sink
+        sink._buffer.append(line)
+        sink._buffered += len(line)
+        if sink._buffered >= self.flush_bytes:
+            self._flush(sink)
+
+    def _flush_due(self, force: bool = False) -> None:
+        now = time.monotonic()
+        for sink in list(self._dirty.values()):
+            if force or now - sink._first_buffered_at >= self.flush_interval:
+                self._flush(sink)
+
+    def _run(self) -> None:
+        while not (self._stopped.is_set() and self._queue.empty()):
+            try:
+                sink, payload = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush_due()
+                continue
+            self._handle(sink, payload)
+            while True:
+                try:
+                    sink, payload = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._handle(sink, payload)
+            self._flush_due()
+        self._flush_due(force=True)
@@ -0,0 +1,330 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import asyncssh
+import paramiko
+
+from app.pump import ChannelPump
+from app.recorder import RecordingSink
+
+SendCallback = Callable[[bytes], Awaitable[None]]
+CloseCallback = Callable[[], Awaitable[None]]
+PoolKey = Tuple[str, int, str]
+
+
+class _PooledTransport:
+    def __init__(self, client: paramiko.SSHClient, username: str, max_channels: int) -> None:
+        self.client = client
+        self.username = username
+        self.max_channels = max_channels
+        self.channels = 0
+        self.idle_since = time.monotonic()
+
+    def usable(self, username: str) -> bool:
+        transport = self.client.get_transport()
+        return (
+            transport is not None
+            and transport.is_active()
+            and self.username == username
+            and self.channels < self.max_channels
+        )
+
+
+class TransportPool:
+    def __init__(self, max_channels: int, idle_timeout: float) -> None:
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+        self.opened_transports = 0
+        self.reused_channels = 0
+        self._entries: Dict[PoolKey, List[_PooledTransport]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, name="ssh-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reserve(self, key: PoolKey, username: str) -> Optional[_PooledTransport]:
+        with self._lock:
+            self._ensure_reaper()
+            for entry in self._entries.get(key, []):
+                if entry.usable(username):
+                    entry.channels += 1
+                    return entry
+        return None
+
+    def _release(self, entry: _PooledTransport) -> None:
+        with self._lock:
+            entry.channels -= 1
+            if entry.channels == 0:
+                entry.idle_since = time.monotonic()
+
+    def _add(self, key: PoolKey, entry: _PooledTransport) -> None:
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+            self.opened_transports += 1
+
+    def open_channel(
+        self,
+        key: PoolKey,
+        username: str,
+        connect: Callable[[], paramiko.SSHClient],
+    ) -> Tuple[paramiko.Channel, Callable[[], None]]:
+        while True:
+            entry = self._reserve(key, username)
+            if entry is None:
+                break
+            try:
+                channel = entry.client.invoke_shell(term="xterm")
+            except (paramiko.SSHException, OSError):
+                with self._lock:
+                    entry.max_channels = entry.channels - 1
+                self._release(entry)
+                continue
+            with self._lock:
+                self.reused_channels += 1
+            return channel, lambda entry=entry: self._release(entry)
+        client = connect()
+        entry = _PooledTransport(client, username, self.max_channels)
+        entry.channels = 1
+        try:
+            channel = client.invoke_shell(term="xterm")
+        except Exception:
+            client.close()
+            raise
+        self._add(key, entry)
+        return channel, lambda: self._release(entry)
+
+    def _evict(self, force: bool = False) -> None:
+        now = time.monotonic()
+        closing: List[paramiko.SSHClient] = []
+        with self._lock:
+            for key in list(self._entries):
+                keep = []
+                for entry in self._entries[key]:
+                    transport = entry.client.get_transport()
+                    alive = transport is not None and transport.is_active()
+                    idle = entry.channels == 0 and now - entry.idle_since >= self.idle_timeout
+                    if force or not alive or idle:
+                        closing.append(entry.client)
+                    else:
+                        keep.append(entry)
+                if keep:
+                    self._entries[key] = keep
+                else:
+                    del self._entries[key]
+        for client in closing:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def _reap_loop(self) -> None:
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._stopped.wait(interval):
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = [entry for group in self._entries.values() for entry in group]
+            return {
+                "transports": len(entries),
+                "channels": sum(entry.channels for entry in entries),
+                "opened_transports": self.opened_transports,
+                "reused_channels": self.reused_channels,
+            }
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._evict(force=True)
+
+
+class ParamikoSession:
+    def __init__(
+        self,
+        client: Optional[paramiko.SSHClient],
+        channel: paramiko.Channel,
+        pump: ChannelPump,
+        release: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.client = client
+        self.channel = channel
+        self.pump = pump
+        self.release = release
+
+    def start(self, sink: RecordingSink, send: SendCallback, on_close: CloseCallback) -> None:
+        loop = asyncio.get_running_loop()
+
+        def on_data(data: bytes) -> None:
+            sink.write_output(data)
+            asyncio.run_coroutine_threadsafe(send(data), loop)
+
+        def on_closed() -> None:
+            asyncio.run_coroutine_threadsafe(on_close(), loop)
+
+        self.pump.register(self.channel, on_data, on_closed)
+
+    async def send(self, data: bytes) -> None:
+        self.channel.send(data)
+
+    async def close(self) -> None:
+        self.pump.unregister(self.channel)
+        try:
+            self.channel.close()
+            if self.client is not None:
+                self.client.close()
+        except Exception:
+            pass
+        if self.release is not None:
+            self.release()
+            self.release = None
+
+
+class ParamikoEngine:
+    name = "paramiko"
+
+    def __init__(self, pump_workers: int, pool: Optional[TransportPool] = None) -> None:
+        self.pump = ChannelPump(workers=pump_workers)
+        self.pool = pool
+
+    def _client(self, host: str, port: int, username: str, password: str) -> paramiko.SSHClient:
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(host, port=port, username=username, password=password)
+        except Exception:
+            client.close()
+            raise
+        return client
+
+    def _connect(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        pool_key: Optional[str],
+    ) -> ParamikoSession:
+        if self.pool is not None and pool_key is not None:
+            channel, release = self.pool.open_channel(
+                (host, port, pool_key),
+                username,
+                lambda: self._client(host, port, username, password),
+            )
+            return ParamikoSession(None, channel, self.pump, release)
+        client = self._client(host, port, username, password)
+        try:
+            channel = client.invoke_shell(term="xterm")
+        except Exception:
+            client.close()
+            raise
+        return ParamikoSession(client, channel, self.pump)
+
+    async def open(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        pool_key: Optional[str] = None,
+    ) -> ParamikoSession:
+        return await asyncio.to_thread(self._connect, host, port, username, password, pool_key)
+
+    def shutdown(self) -> None:
+        self.pump.shutdown()
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+class AsyncSSHSession:
+    def __init__(
+        self,
+        conn: asyncssh.SSHClientConnection,
+        process: asyncssh.SSHClientProcess,
+        chunk_size: int,
+    ) -> None:
+        self.conn = conn
+        self.process = process
+        self.chunk_size = chunk_size
+        self._reader: Optional[asyncio.Task] = None
+
+    def start(self, sink: RecordingSink, send: SendCallback, on_close: CloseCallback) -> None:
+        self._reader = asyncio.create_task(self._read(sink, send, on_close))
+
+    async def _read(self, sink: RecordingSink, send: SendCallback, on_close: CloseCallback) -> None:
+        try:
+            while True:
+                data = await self.process.stdout.read(self.chunk_size)
+                if not data:
+                    break
+                sink.write_output(data)
+                await send(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+        await on_close()
+
+    async def send(self, data: bytes) -> None:
+        self.process.stdin.write(data)
+        await self.process.stdin.drain()
+
+    async def close(self) -> None:
+        if self._reader is not None and self._reader is not asyncio.current_task():
+            self._reader.cancel()
+        self.process.close()
+        self.conn.close()
+        try:
+            await self.conn.wait_closed()
+        except (asyncssh.Error, OSError):
+            pass
+
+
+class AsyncSSHEngine:
+    name = "asyncssh"
+
+    def __init__(self, chunk_size: int = 32768) -> None:
+        self.chunk_size = chunk_size
+
+    async def open(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        pool_key: Optional[str] = None,
+    ) -> AsyncSSHSession:
+        conn = await asyncssh.connect(
+            host,
+            port=port,
+            username=username,
+            password=password,
+            known_hosts=None,
+        )
+        try:
+            process = await conn.create_process(term_type="xterm", encoding=None)
+        except Exception:
+            conn.close()
+            raise
+        return AsyncSSHSession(conn, process, self.chunk_size)
+
+    def shutdown(self) -> None:
+        pass
+
+
+def create_ssh_engine(
+    name: str,
+    pump_workers: int,
+    pool_max_channels: int = 0,
+    pool_idle_timeout: float = 60.0,
+):
+    if name == "asyncssh":
+        return AsyncSSHEngine()
+    if name == "paramiko":
+        pool = TransportPool(pool_max_channels, pool_idle_timeout) if pool_max_channels > 0 else None
+        return ParamikoEngine(pump_workers, pool)
+    raise ValueError(f"Unknown SSH engine: {name}")
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+CacheKey = Tuple[str, Optional[int]]
+
+
+class SecretCache:
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._aead = AESGCM(AESGCM.generate_key(bit_length=256))
+        self._entries: Dict[CacheKey, Tuple[float, bytes, bytes]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _associated_data(self, key: CacheKey) -> bytes:
+        return f"{key[0]}@{key[1]}".encode("utf-8")
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, nonce, ciphertext = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+        plaintext = self._aead.decrypt(nonce, ciphertext, self._associated_data(key))
+        return json.loads(plaintext)
+
+    def put(self, key: CacheKey, data: Dict[str, Any], ttl: float) -> None:
+        if not self.enabled or ttl <= 0:
+            return
+        nonce = os.urandom(12)
+        ciphertext = self._aead.encrypt(nonce, json.dumps(data).encode("utf-8"), self._associated_data(key))
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                for stale in [k for k, entry in self._entries.items() if entry[0] < now]:
+                    del self._entries[stale]
+            while len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (now + ttl, nonce, ciphertext)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+
+class VaultClient:
+    def __init__(
+        self,
+        addr: str,
+        token: str,
+        mount: str,
+        cache_ttl: float,
+        cache_size: int,
+        max_connections: int,
+        timeout: float,
+    ) -> None:
+        self.addr = addr.rstrip("/")
+        self.token = token
+        self.mount = mount
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cache = SecretCache(cache_ttl, cache_size)
+        self.cache_hits = 0
+        self.vault_reads = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[CacheKey, "asyncio.Task[Dict[str, Any]]"] = {}
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.addr,
+                headers={"X-Vault-Token": self.token},
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def _fetch_kv2(self, path: str, version: Optional[int]) -> Tuple[Dict[str, Any], Optional[int], float]:
+        params = {"version": version} if version is not None else None
+        response = await self._http().get(f"/v1/{self.mount}/data/{path}", params=params)
+        response.raise_for_status()
+        self.vault_reads += 1
+        body = response.json()
+        data = body["data"]["data"]
+        resolved = (body["data"].get("metadata") or {}).get("version")
+        lease = body.get("lease_duration") or 0
+        ttl = min(self.cache.ttl, lease) if lease > 0 else self.cache.ttl
+        return data, resolved, ttl
+
+    async def read_kv2(self, path: str, version: Optional[int] = None) -> Dict[str, Any]:
+        key = (path, version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load_kv2(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_load(key, done))
+        return dict(await asyncio.shield(task))
+
+    async def _load_kv2(self, key: CacheKey) -> Dict[str, Any]:
+        path, version = key
+        data, resolved, ttl = await self._fetch_kv2(path, version)
+        self.cache.put(key, data, ttl)
+        if resolved is not None and resolved != version:
+            self.cache.put((path, resolved), data, ttl)
+        return data
+
+    def _finish_load(self, key: CacheKey, task: "asyncio.Task[Dict[str, Any]]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"cache_hits": self.cache_hits, "vault_reads": self.vault_reads}
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncssh
+
+from app.recorder import RecordingPipeline
+from app.ssh_engines import create_ssh_engine
+
+
+class EchoServer(asyncssh.SSHServer):
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return True
+
+
+async def _echo_shell(process: asyncssh.SSHServerProcess) -> None:
+    try:
+        while True:
+            data = await process.stdin.read(4096)
+            if not data:
+                break
+            process.stdout.write(data)
+    except (asyncssh.Error, OSError):
+        pass
+    process.exit(0)
+
+
+async def serve(port: int) -> None:
+    key = asyncssh.generate_private_key("ssh-ed25519")
+    await asyncssh.create_server(
+        EchoServer,
+        "127.0.0.1",
+        port,
+        server_host_keys=[key],
+        process_factory=_echo_shell,
+        encoding=None,
+    )
+    print("ready", flush=True)
+    await asyncio.Event().wait()
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/status", "r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def measure(engine_name: str, port: int, steps: List[int], memory_limit_mb: int) -> dict:
+    engine = create_ssh_engine(engine_name, pump_workers=2)
+    recorder = RecordingPipeline(flush_interval=0.5)
+    recordings = tempfile.mkdtemp(prefix="bench-engines-")
+    sessions = []
+    sinks = []
+    echoed = asyncio.Event()
+
+    async def send(data: bytes) -> None:
+        echoed.set()
+
+    async def on_close() -> None:
+        pass
+
+    baseline = _rss_kb()
+    result = {"engine": engine_name, "steps": [], "max_sessions": 0, "error": None}
+    started = time.perf_counter()
+    try:
+        for target in steps:
+            while len(sessions) < target:
+                session = await engine.open("127.0.0.1", port, "bench", "bench")
+                sink = recorder.open(os.path.join(recordings, f"session-{len(sessions)}.log"))
+                session.start(sink, send, on_close)
+                sessions.append(session)
+                sinks.append(sink)
+            echoed.clear()
+            await sessions[-1].send(b"ping\n")
+            await asyncio.wait_for(echoed.wait(), 10)
+            rss = _rss_kb()
+            result["steps"].append(
+                {
+                    "sessions": len(sessions),
+                    "rss_mb": round(rss / 1024, 1),
+                    "kb_per_session": round((rss - baseline) / len(sessions), 1),
+                    "threads": threading.active_count(),
+                    "elapsed_s": round(time.perf_counter() - started, 2),
+                }
+            )
+            result["max_sessions"] = len(sessions)
+            if memory_limit_mb and rss / 1024 > memory_limit_mb:
+                break
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        for session in sessions:
+            await session.close()
+        for sink in sinks:
+            await asyncio.to_thread(sink.close, 5)
+        engine.shutdown()
+        recorder.shutdown()
+    return result
+
+
+def run_engine(engine_name: str, port: int, steps: List[int], memory_limit_mb: int) -> dict:
+    command = [
+        sys.executable,
+        __file__,
+        "--measure",
+        engine_name,
+        "--port",
+        str(port),
+        "--memory-limit-mb",
+        str(memory_limit_mb),
+        "--steps",
+        *[str(step) for step in steps],
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare memory per session and session capacity of SSH engines.")
+    parser.add_argument("--engines", nargs="+", default=["paramiko", "asyncssh"])
+    parser.add_argument("--steps", type=int, nargs="+", default=[50, 100, 250, 500, 1000])
+    parser.add_argument("--memory-limit-mb", type=int, default=2048)
+    parser.add_argument("--port", type=int, default=8222)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve(args.port))
+        return
+    if args.measure:
+        print(json.dumps(asyncio.run(measure(args.measure, args.port, args.steps, args.memory_limit_mb))))
+        return
+
+    server = subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--port", str(args.port)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        server.stdout.readline()
+        print(f"{'engine':<9} {'sessions':>8} {'rss MB':>8} {'KB/sess':>8} {'threads':>8} {'open s':>7}")
+        for engine_name in args.engines:
+            result = run_engine(engine_name, args.port, args.steps, args.memory_limit_mb)
+            for step in result["steps"]:
+                print(
+                    f"{engine_name:<9} {step['sessions']:>8} {step['rss_mb']:>8} {step['kb_per_session']:>8} "
+                    f"{step['threads']:>8} {step['elapsed_s']:>7}"
+                )
+            note = f" ({result['error']})" if result["error"] else ""
+            print(f"{engine_name:<9} max sessions reached: {result['max_sessions']}{note}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import os
+import select
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.pump import ChannelPump
+
+
+class FakeChannel:
+    def __init__(self) -> None:
+        self.local, self.remote = socket.socketpair()
+        self.poller = select.poll()
+        self.poller.register(self.local, select.POLLIN)
+
+    def fileno(self) -> int:
+        return self.local.fileno()
+
+    def recv_ready(self) -> bool:
+        return bool(self.poller.poll(0))
+
+    def recv(self, size: int) -> bytes:
+        return self.local.recv(size)
+
+    def close(self) -> None:
+        self.local.close()
+        self.remote.close()
+
+
+class PollingReaders:
+    def __init__(self) -> None:
+        self.stop_event = threading.Event()
+        self.threads: List[threading.Thread] = []
+
+    def register(self, channel: FakeChannel, on_data: Callable[[bytes], None]) -> None:
+        def reader() -> None:
+            while not self.stop_event.is_set():
+                if channel.recv_ready():
+                    data = channel.recv(4096)
+                    if not data:
+                        break
+                    on_data(data)
+                else:
+                    time.sleep(0.01)
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def shutdown(self) -> None:
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join()
+
+
+def run(engine: str, sessions: int, busy: bool, duration: float, interval: float, workers: int) -> dict:
+    channels = [FakeChannel() for _ in range(sessions)]
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def on_data(data: bytes) -> None:
+        received = time.perf_counter()
+        for stamp in data.split(b"\n"):
+            if stamp:
+                with lock:
+                    latencies.append(received - float(stamp))
+
+    if engine == "pump":
+        pump = ChannelPump(workers=workers)
+        for channel in channels:
+            pump.register(channel, on_data, lambda: None)
+        stop = pump.shutdown
+    else:
+        readers = PollingReaders()
+        for channel in channels:
+            readers.register(channel, on_data)
+        stop = readers.shutdown
+
+    time.sleep(0.5)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    deadline = wall_start + duration
+    while time.perf_counter() < deadline:
+        if busy:
+            for channel in channels:
+                channel.remote.send(f"{time.perf_counter()}\n".encode())
+        time.sleep(interval)
+    time.sleep(0.1)
+    cpu_used = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    stop()
+    for channel in channels:
+        channel.close()
+
+    result = {
+        "engine": engine,
+        "sessions": sessions,
+        "mode": "busy" if busy else "idle",
+        "cpu_pct": round(100 * cpu_used / wall, 1),
+        "echoes": len(latencies),
+    }
+    if latencies:
+        ordered = sorted(latencies)
+        result["p50_ms"] = round(1000 * statistics.median(ordered), 2)
+        result["p99_ms"] = round(1000 * ordered[int(len(ordered) * 0.99) - 1], 2)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the polling SSH reader with the selector pump.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--engines", nargs="+", default=["poll", "pump"])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'engine':<6} {'sessions':>8} {'mode':<5} {'cpu%':>7} {'echoes':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for sessions in args.sessions:
+        for busy in (False, True):
+            for engine in args.engines:
+                row = run(engine, sessions, busy, args.duration, args.interval, args.workers)
+                print(
+                    f"{row['engine']:<6} {row['sessions']:>8} {row['mode']:<5} {row['cpu_pct']:>7} "
+                    f"{row['echoes']:>8} {row.get('p50_ms', '-'):>8} {row.get('p99_ms', '-'):>8}"
+                )
+
+
+if __name__ == "__main__":
+    main()
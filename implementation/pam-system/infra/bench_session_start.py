@@ -0,0 +1,91 @@
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+API_URL = os.getenv("BENCH_API_URL", "http://localhost:8000")
+ADMIN_EMAIL = os.getenv("SEED_ADMIN_EMAIL", "admin@example.com")
+ADMIN_PASSWORD = os.getenv("SEED_ADMIN_PASSWORD", "Admin123!")
+
+
+def login(http: requests.Session) -> str:
+    response = http.post(f"{API_URL}/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}, timeout=10)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def approved_jit_request(http: requests.Session, headers: dict) -> int:
+    assets = http.get(f"{API_URL}/assets", headers=headers, timeout=10).json()
+    roles = http.get(f"{API_URL}/roles", headers=headers, timeout=10).json()
+    if not assets or not roles:
+        raise SystemExit("Seed the database first (infra/seed.sh)")
+    response = http.post(
+        f"{API_URL}/jit-requests",
+        headers=headers,
+        json={
+            "asset_id": assets[0]["id"],
+            "role_id": roles[0]["id"],
+            "reason": "session start benchmark",
+            "duration_minutes": 60,
+        },
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure POST /sessions/start throughput and latency.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--label", default="current")
+    args = parser.parse_args()
+
+    setup = requests.Session()
+    token = login(setup)
+    headers = {"Authorization": f"Bearer {token}"}
+    jit_id = approved_jit_request(setup, headers)
+
+    local = threading.local()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def start_one(_: int) -> None:
+        nonlocal errors
+        http = getattr(local, "http", None)
+        if http is None:
+            http = local.http = requests.Session()
+        began = time.perf_counter()
+        response = http.post(
+            f"{API_URL}/sessions/start",
+            headers=headers,
+            json={"jit_request_id": jit_id},
+            timeout=30,
+        )
+        elapsed = time.perf_counter() - began
+        with lock:
+            if response.status_code == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(start_one, range(args.requests)))
+    wall = time.perf_counter() - began
+
+    ordered = sorted(latencies) or [0.0]
+    print(
+        f"{args.label}: {len(latencies)} ok, {errors} errors, {len(latencies) / wall:.1f} starts/s, "
+        f"p50 {1000 * statistics.median(ordered):.1f} ms, "
+        f"p99 {1000 * ordered[max(0, int(len(ordered) * 0.99) - 1)]:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
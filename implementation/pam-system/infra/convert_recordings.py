@@ -0,0 +1,35 @@
+import argparse
+import glob
+import os
+import sys
+
+sys.path.append("/app")
+
+from app.recordings import CODEC_NONE, CODEC_ZLIB, binary_recording_path, convert_log_recording
+
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", "/data/recordings")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert JSON-lines session recordings to the indexed binary format.")
+    parser.add_argument("paths", nargs="*", help="Recording .log files (defaults to every session-*.log)")
+    parser.add_argument("--no-compress", action="store_true", help="Store blocks without zlib compression")
+    parser.add_argument("--block-bytes", type=int, default=65536)
+    parser.add_argument("--force", action="store_true", help="Overwrite existing .rec files")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(
+        path for path in glob.glob(os.path.join(RECORDINGS_DIR, "session-*.log")) if not path.endswith(".cmd.log")
+    )
+    codec = CODEC_NONE if args.no_compress else CODEC_ZLIB
+    for path in paths:
+        rec_path = binary_recording_path(path)
+        if os.path.exists(rec_path) and not args.force:
+            print(f"skip {path}: {rec_path} exists")
+            continue
+        rec_path, count = convert_log_recording(path, rec_path, codec=codec, block_bytes=args.block_bytes)
+        print(f"{path} -> {rec_path}: {count} chunks, {os.path.getsize(path)} -> {os.path.getsize(rec_path)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = os.getenv("BENCH_API_URL", "http://localhost:8000")
+ADMIN_EMAIL = os.getenv("SEED_ADMIN_EMAIL", "admin@example.com")
+ADMIN_PASSWORD = os.getenv("SEED_ADMIN_PASSWORD", "Admin123!")
+
+ENDPOINTS = [
+    "/jit-requests",
+    "/sessions",
+    "/audit?page_size=20&count=none&cursor=",
+]
+
+
+def login() -> dict:
+    response = requests.post(
+        f"{API_URL}/auth/login",
+        json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+def run_clients(
+    first: int,
+    count: int,
+    total: int,
+    tokens: dict,
+    start_at: float,
+    ramp: float,
+    duration: float,
+    include_refresh: bool,
+) -> tuple[dict[str, list[float]], dict[str, int]]:
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    lock = threading.Lock()
+    measure_from = start_at + ramp
+    deadline = measure_from + duration
+
+    def run_client(index: int) -> None:
+        time.sleep(max(0.0, start_at + ramp * index / max(1, total) - time.time()))
+        http = requests.Session()
+        http.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        step = index
+        while time.time() < deadline:
+            path = ENDPOINTS[step % len(ENDPOINTS)]
+            step += 1
+            began = time.time()
+            clock = time.perf_counter()
+            try:
+                if include_refresh and step % (len(ENDPOINTS) + 1) == 0:
+                    path = "/auth/refresh"
+                    response = http.post(
+                        f"{API_URL}{path}",
+                        json={"refresh_token": tokens["refresh_token"]},
+                        timeout=60,
+                    )
+                else:
+                    response = http.get(f"{API_URL}{path}", headers=headers, timeout=60)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - clock
+            if began < measure_from:
+                continue
+            name = path.split("?")[0]
+            with lock:
+                if ok:
+                    latencies.setdefault(name, []).append(elapsed)
+                else:
+                    errors[name] = errors.get(name, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        list(pool.map(run_client, range(first, first + count)))
+    return latencies, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure requests/s and latency of the hot API reads under many clients.")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="client processes; clients are split across them so one GIL does not cap the offered load",
+    )
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which clients are started")
+    parser.add_argument("--include-refresh", action="store_true", help="also exercise POST /auth/refresh")
+    parser.add_argument("--label", default="current")
+    args = parser.parse_args()
+
+    tokens = login()
+    processes = max(1, min(args.processes, args.clients))
+    start_at = time.time() + 1.0
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = []
+        first = 0
+        for worker in range(processes):
+            count = args.clients // processes + (1 if worker < args.clients % processes else 0)
+            futures.append(
+                pool.submit(
+                    run_clients,
+                    first,
+                    count,
+                    args.clients,
+                    tokens,
+                    start_at,
+                    args.ramp,
+                    args.duration,
+                    args.include_refresh,
+                )
+            )
+            first += count
+        for future in futures:
+            worker_latencies, worker_errors = future.result()
+            for name, values in worker_latencies.items():
+                latencies.setdefault(name, []).extend(values)
+            for name, value in worker_errors.items():
+                errors[name] = errors.get(name, 0) + value
+    wall = args.duration
+
+    print(f"{args.label}: {args.clients} clients in {processes} processes, {wall:.0f} s measured after a {args.ramp:.0f} s ramp")
+    print(f"{'endpoint':<16} {'ok':>8} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    every: list[float] = []
+    for name in sorted(set(latencies) | set(errors)):
+        ordered = sorted(latencies.get(name, [])) or [0.0]
+        every.extend(latencies.get(name, []))
+        print(
+            f"{name:<16} {len(latencies.get(name, [])):>8} {errors.get(name, 0):>7} "
+            f"{len(latencies.get(name, [])) / wall:>8.1f} {1000 * statistics.median(ordered):>8.1f} "
+            f"{1000 * percentile(ordered, 0.99):>8.1f}"
+        )
+    ordered = sorted(every) or [0.0]
+    print(
+        f"{'total':<16} {len(every):>8} {sum(errors.values()):>7} {len(every) / wall:>8.1f} "
+        f"{1000 * statistics.median(ordered):>8.1f} {1000 * percentile(ordered, 0.99):>8.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,11 @@ sys.path.append("/app")
 import pyotp
 from sqlalchemy.orm import Session
 
+from app.core.principals import notify_principal_changed
 from app.core.security import get_password_hash
 from app.db import SessionLocal, run_migrations
 from app.models import Asset, Credential, Role, User, UserRole
-from app.vault import ensure_kv_v2_mount, write_kv2
+from app.vault import write_kv2
 
 ADMIN_EMAIL = os.getenv("SEED_ADMIN_EMAIL", "admin@example.com")
 ADMIN_PASSWORD = os.getenv("SEED_ADMIN_PASSWORD", "Admin123!")
@@ -58,6 +59,7 @@ def main() -> None:
 
         if not db.query(UserRole).filter(UserRole.user_id == user.id, UserRole.role_id == sysadmin.id).first():
             db.add(UserRole(user_id=user.id, role_id=sysadmin.id))
+            notify_principal_changed(db, user.id)
             db.commit()
 
         asset = db.query(Asset).filter(Asset.name == "Demo SSH").first()
@@ -67,7 +69,6 @@ def main() -> None:
             db.commit()
             db.refresh(asset)
 
-        ensure_kv_v2_mount()
         vault_path = f"assets/{asset.id}"
         write_kv2(vault_path, {"username": "demo", "password": "demo123"})
 